@@ -19,11 +19,14 @@ The "Pulse" Strategy:
     - Topology is cached in-memory for instant retrieval
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.routing import APIRoute
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
+import asyncio
+import gzip
 import json
 import logging
 import time
@@ -66,6 +69,43 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# =============================================================================
+# COMPRESSED REQUEST BODIES
+# =============================================================================
+# The Controller gzips large batched payloads (Content-Encoding: gzip).
+# Unsupported encodings get HTTP 415 so the Controller falls back to plain JSON.
+
+class GzipRequest(Request):
+    """Request whose body is transparently decompressed."""
+    
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            encoding = self.headers.get("Content-Encoding", "identity").lower()
+            if encoding == "gzip":
+                body = gzip.decompress(body)
+            elif encoding != "identity":
+                raise HTTPException(status_code=415, detail=f"Unsupported Content-Encoding: {encoding}")
+            self._body = body
+        return self._body
+
+
+class GzipRoute(APIRoute):
+    """Route class that hands handlers a GzipRequest."""
+    
+    def get_route_handler(self):
+        original_route_handler = super().get_route_handler()
+        
+        async def gzip_route_handler(request: Request) -> Response:
+            request = GzipRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+        
+        return gzip_route_handler
+
+
+# Must be set before any route is registered
+app.router.route_class = GzipRoute
+
 # =============================================================================
 # PYDANTIC MODELS (Data Contracts)
 # =============================================================================
@@ -149,6 +189,12 @@ CURRENT_TOPOLOGY: Dict[str, Any] = {
 # Commands are added by Frontend and polled by Controller
 PENDING_COMMANDS: List[Dict[str, Any]] = []
 
+# Set whenever a command is queued so long-polling Controllers wake up
+COMMAND_AVAILABLE = asyncio.Event()
+
+# Upper bound for how long a long-poll request may be held open (seconds)
+MAX_COMMAND_WAIT = 60.0
+
 
 # =============================================================================
 # CONTROL MODELS (Manual Intervention)
@@ -323,12 +369,17 @@ async def receive_stats(stats: StatsModel):
     Returns:
         dict: Confirmation message
     """
+    # Batched updates carry several entries under "batch"; the Frontend
+    # still receives one stats_update per entry
+    entries = stats.data.get("batch", [stats.data])
+    
     # Broadcast stats to all connected Frontend clients
-    await manager.broadcast({
-        "type": "stats_update",
-        "timestamp": stats.timestamp or time.time(),
-        "data": stats.data
-    })
+    for entry in entries:
+        await manager.broadcast({
+            "type": "stats_update",
+            "timestamp": stats.timestamp or time.time(),
+            "data": entry
+        })
     
     logger.debug(f"[STATS] Broadcast stats update")
     
@@ -389,6 +440,33 @@ async def receive_alert(alert: AlertModel, db: Session = Depends(get_db)):
     }
 
 
+@app.post("/api/alerts", summary="Receive a batch of security alerts from Controller")
+async def receive_alerts(alerts: List[AlertModel], db: Session = Depends(get_db)):
+    """
+    Receive several security alerts from the Controller in one request.
+    
+    Called by: Controller once per monitor tick when new alerts were raised
+    Action: Each alert is saved and broadcast exactly like POST /api/alert
+    
+    Args:
+        alerts: List of security alert JSON objects
+        db: Database session (injected)
+    
+    Returns:
+        dict: Database IDs of the created alerts
+    """
+    alert_ids = []
+    for alert in alerts:
+        result = await receive_alert(alert, db)
+        alert_ids.append(result["alert_id"])
+    
+    return {
+        "status": "success",
+        "message": f"{len(alert_ids)} alerts saved and broadcast",
+        "alert_ids": alert_ids
+    }
+
+
 # =============================================================================
 # REST ENDPOINTS - PROVIDERS (Called by Frontend)
 # =============================================================================
@@ -472,6 +550,7 @@ async def request_block_ip(request: BlockIPRequest):
     }
     
     PENDING_COMMANDS.append(command)
+    COMMAND_AVAILABLE.set()
     
     logger.info(f"[CONTROL] 🎯 Block command queued: {request.ip} for {request.duration}s")
     
@@ -524,6 +603,36 @@ async def get_pending_command():
     return {"command": None, "ip": None, "duration": None}
 
 
+@app.get("/api/control/wait", response_model=PendingCommandResponse,
+         summary="Wait for the next pending command (long-polled by Controller)")
+async def wait_for_command(timeout: float = 30.0):
+    """
+    Long-poll variant of /api/control/pending.
+    
+    Called by: Controller's command listener, re-issued as soon as it returns
+    Action: Hold the request until a command is queued or `timeout` elapses
+    
+    Replaces the 1-second short-poll: an idle Controller makes one request
+    per `timeout` seconds, and commands are delivered as soon as they arrive.
+    
+    Args:
+        timeout: Maximum seconds to wait (capped at MAX_COMMAND_WAIT)
+    
+    Returns:
+        PendingCommandResponse: Next command or {command: None} on timeout
+    """
+    timeout = min(max(timeout, 0.0), MAX_COMMAND_WAIT)
+    
+    if not PENDING_COMMANDS:
+        COMMAND_AVAILABLE.clear()
+        try:
+            await asyncio.wait_for(COMMAND_AVAILABLE.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    return await get_pending_command()
+
+
 @app.get("/api/control/queue", summary="View pending commands queue")
 async def view_command_queue():
     """
@@ -616,7 +725,9 @@ if __name__ == "__main__":
     print("    - POST /api/topology")
     print("    - POST /api/stats")
     print("    - POST /api/alert")
+    print("    - POST /api/alerts           (batched)")
     print("    - GET  /api/control/pending  (polling)")
+    print("    - GET  /api/control/wait     (long-polling)")
     print("\n  Frontend should connect to:")
     print("    - GET  /api/topology")
     print("    - GET  /api/history/alerts")
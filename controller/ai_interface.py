@@ -11,10 +11,11 @@ This module handles loading, calling, and graceful fallback.
 import os
 import logging
 
+import numpy as np
+
 # Try to import ML libraries (may not be installed)
 try:
     import joblib
-    import numpy as np
     import pandas as pd
     ML_AVAILABLE = True
 except ImportError:
@@ -132,6 +133,64 @@ class SentinelAI:
             logging.error(f"[SENTINEL] Prediction error: {e}")
             return {"is_threat": False, "attack_type": "Error"}
     
+    def predict_batch(self, X) -> tuple:
+        """
+        Predict attacks for many flows with a single call into each model.
+        
+        Same decision logic as predict(), but the per-call model overhead is
+        paid once per batch instead of once per flow.
+        
+        Args:
+            X: (N, 3) array of [pps, bps, avg_pkt_size] rows
+            
+        Returns:
+            Tuple of (is_threat, attack_type) arrays aligned with the rows of X
+        """
+        # float32 is what sklearn's tree ensembles evaluate on internally, so
+        # converting here loses nothing and saves them a float64 copy.
+        # Coarser types (bfloat16/int16) would move values across split
+        # thresholds and change predictions.
+        X = np.asarray(X, dtype=np.float32).reshape(-1, 3)
+        n = len(X)
+        
+        if not self.enabled:
+            # Fallback
+            is_threat = (X[:, 0] > ATTACK_PPS_THRESHOLD) | (X[:, 1] > ATTACK_BPS_THRESHOLD)
+            for pps, bps in X[is_threat, :2]:
+                logging.warning(f"[SENTINEL-FALLBACK] High traffic detected: PPS={pps}, BPS={bps}")
+            attack_type = np.where(is_threat, "Fallback Threshold", "Normal")
+            return is_threat, attack_type
+        
+        try:
+            features = pd.DataFrame(X, columns=['pps', 'bps', 'avg_pkt_size'])
+            
+            # Scale features for anomaly detection
+            if self.scaler:
+                features_scaled = pd.DataFrame(self.scaler.transform(features), columns=features.columns)
+            else:
+                features_scaled = features
+            
+            # 1. Anomaly Detection (-1 is anomaly)
+            is_anomaly = np.zeros(n, dtype=bool)
+            if self.anomaly_model:
+                is_anomaly = self.anomaly_model.predict(features_scaled) == -1
+            
+            # 2. Classification (uses raw features)
+            attack_type = np.full(n, "Normal", dtype=object)
+            if self.classifier_model:
+                attack_type = np.asarray(self.classifier_model.predict(features), dtype=object)
+            
+            # 3. Decision Logic (OR Gate) - specific type overrides generic "Unknown"
+            is_classified = attack_type != "Normal"
+            is_threat = is_anomaly | is_classified
+            final_type = np.where(is_classified, attack_type,
+                                  np.where(is_anomaly, "Unknown Anomaly", "Normal"))
+            return is_threat, final_type
+        
+        except Exception as e:
+            logging.error(f"[SENTINEL] Batch prediction error: {e}")
+            return np.zeros(n, dtype=bool), np.full(n, "Error", dtype=object)
+    
     def _fallback_predict(self, pps: float, bps: float) -> bool:
         """Simple threshold-based attack detection when AI is unavailable."""
         if pps > ATTACK_PPS_THRESHOLD:
@@ -441,15 +500,7 @@ def format_flow_for_ai(stat, dpid: int, timestamp: float) -> dict:
     
     avg_pkt_size = stat.byte_count / stat.packet_count if stat.packet_count > 0 else 0
     
-    # Extract output port from instructions if available
-    out_port = 0
-    if hasattr(stat, 'instructions') and stat.instructions:
-        for inst in stat.instructions:
-            if hasattr(inst, 'actions'):
-                for action in inst.actions:
-                    if hasattr(action, 'port'):
-                        out_port = action.port
-                        break
+    out_port = _flow_out_port(stat)
     
     return {
         'timestamp': timestamp,
@@ -465,3 +516,78 @@ def format_flow_for_ai(stat, dpid: int, timestamp: float) -> dict:
         'bps': bps,
         'avg_pkt_size': avg_pkt_size
     }
+
+
+def _flow_out_port(stat) -> int:
+    """Extract the output port from a flow's instructions (0 if none)."""
+    if hasattr(stat, 'instructions') and stat.instructions:
+        for inst in stat.instructions:
+            if hasattr(inst, 'actions'):
+                for action in inst.actions:
+                    if hasattr(action, 'port'):
+                        return action.port
+    return 0
+
+
+# One row per flow - the array form of format_flow_for_ai's dictionary.
+# MACs are stored as 48-bit integers; pps/bps start as lifetime averages.
+FLOW_DTYPE = np.dtype([
+    ('timestamp', 'f8'),
+    ('dpid', 'u8'),
+    ('src', 'u8'),
+    ('dst', 'u8'),
+    ('in_port', 'u4'),
+    ('out_port', 'u4'),
+    ('packet_count', 'u8'),
+    ('byte_count', 'u8'),
+    ('duration_sec', 'f4'),
+    ('pps', 'f4'),
+    ('bps', 'f4'),
+    ('avg_pkt_size', 'f4'),
+])
+
+
+def _flow_row(stat, dpid: int, timestamp: float) -> tuple:
+    """Extract one FLOW_DTYPE row from an OpenFlow flow stat (pps/bps/avg filled later)."""
+    match = stat.match
+    return (
+        timestamp,
+        dpid,
+        int(match.get('eth_src', '0').replace(':', ''), 16),
+        int(match.get('eth_dst', '0').replace(':', ''), 16),
+        match.get('in_port', 0),
+        _flow_out_port(stat),
+        stat.packet_count,
+        stat.byte_count,
+        stat.duration_sec + (stat.duration_nsec / 1e9),
+        0.0, 0.0, 0.0,
+    )
+
+
+def format_flows_for_ai(stats: list, dpid: int, timestamp: float) -> np.ndarray:
+    """
+    Format a batch of flow statistics as a FLOW_DTYPE structured array.
+    
+    Same fields as format_flow_for_ai, but one contiguous array per reply
+    so rates, sorting and model input are column operations.
+    
+    Args:
+        stats: OpenFlow flow stat objects
+        dpid: Switch datapath ID
+        timestamp: Current timestamp
+        
+    Returns:
+        Structured array with one row per flow
+    """
+    flows = np.array([_flow_row(stat, dpid, timestamp) for stat in stats], dtype=FLOW_DTYPE)
+    
+    duration = flows['duration_sec']
+    packets = flows['packet_count'].astype(np.float64)
+    octets = flows['byte_count'].astype(np.float64)
+    
+    has_time = duration > 0
+    np.divide(packets, duration, out=flows['pps'], where=has_time, casting='unsafe')
+    np.divide(octets, duration, out=flows['bps'], where=has_time, casting='unsafe')
+    np.divide(octets, packets, out=flows['avg_pkt_size'], where=packets > 0, casting='unsafe')
+    
+    return flows
@@ -20,6 +20,7 @@ Usage in Controller:
     client.send_alert(alert_dict)
 """
 
+import gzip
 import json
 import logging
 import threading
@@ -35,6 +36,13 @@ except ImportError:
     REQUESTS_AVAILABLE = False
     logging.warning("requests library not installed. Backend connection disabled.")
 
+# Try to import orjson (faster JSON encoding; falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Import configuration
 try:
     from config import BACKEND_HOST, BACKEND_PORT, BACKEND_ENABLED
@@ -55,9 +63,34 @@ DEFAULT_BACKEND_URL = f"http://{BACKEND_HOST}:{BACKEND_PORT}"
 # Request timeout in seconds (don't wait forever)
 REQUEST_TIMEOUT = 5
 
+# How long the Backend may hold a command long-poll open (seconds).
+# The HTTP timeout is slightly longer so an idle wait is never an error.
+COMMAND_WAIT_TIMEOUT = 30
+
 # Maximum queue size (drop old messages if backend is too slow)
 MAX_QUEUE_SIZE = 100
 
+# Request bodies larger than this are gzip-compressed (bytes)
+COMPRESS_MIN_BYTES = 1024
+
+# Message type -> "sent" counter in BackendClient.stats
+_SENT_COUNTERS = {
+    "topology": "topology_sent",
+    "stats": "stats_sent",
+    "alert": "alerts_sent"
+}
+
+# Envelope for stats updates - send_stats only fills in timestamp/data
+_STATS_TEMPLATE = {"type": "stats_update", "timestamp": 0.0, "data": None}
+
+
+def _dumps(data) -> bytes:
+    """Encode a request body as UTF-8 JSON (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        # Also encodes NumPy scalars/arrays natively
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data).encode()
+
 
 # =============================================================================
 # BACKEND CLIENT CLASS
@@ -102,7 +135,15 @@ class BackendClient:
         self.last_error_time = 0
         self.error_backoff = 5  # Seconds to wait before retry after error
         
-        # Statistics for monitoring
+        # Command listener backoff, kept apart from the POST path's
+        # backend_available so neither one cuts the other's backoff short
+        self._command_retry_at = 0.0
+        
+        # Gzip large bodies until the Backend rejects them (HTTP 415)
+        self.compression_enabled = True
+        
+        # Statistics for monitoring (updated from worker threads - use _bump)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "topology_sent": 0,
             "stats_sent": 0,
@@ -160,19 +201,38 @@ class BackendClient:
         url = f"{self.base_url}{endpoint}"
         
         try:
-            response = requests.post(
-                url,
-                json=data,
-                timeout=REQUEST_TIMEOUT,
-                headers={"Content-Type": "application/json"}
-            )
+            body = _dumps(data)
+            headers = {"Content-Type": "application/json"}
+            response = None
+            
+            # Batched stats repeat the same MACs/keys and compress very well
+            if self.compression_enabled and len(body) > COMPRESS_MIN_BYTES:
+                response = requests.post(
+                    url,
+                    data=gzip.compress(body),
+                    timeout=REQUEST_TIMEOUT,
+                    headers={**headers, "Content-Encoding": "gzip"}
+                )
+                if response.status_code == 415:
+                    # Backend can't decode gzip - send plain JSON from now on
+                    logging.warning("[BACKEND] Compression not supported, disabling")
+                    self.compression_enabled = False
+                    response = None
+            
+            if response is None:
+                response = requests.post(
+                    url,
+                    data=body,
+                    timeout=REQUEST_TIMEOUT,
+                    headers=headers
+                )
             
             if response.status_code == 200:
                 logging.debug(f"[BACKEND] {message_type} sent successfully")
                 self._increment_stat(message_type)
             else:
                 logging.warning(f"[BACKEND] {message_type} failed: HTTP {response.status_code}")
-                self.stats["errors"] += 1
+                self._bump("errors")
                 
         except requests.exceptions.ConnectionError:
             logging.warning(f"[BACKEND] Connection failed - Backend not available")
@@ -190,16 +250,23 @@ class BackendClient:
         """Handle backend communication error with backoff."""
         self.backend_available = False
         self.last_error_time = time.time()
-        self.stats["errors"] += 1
+        self._bump("errors")
+    
+    def _bump(self, counter: str):
+        """
+        Increment a stats counter.
+        
+        Counters are updated from many request threads at once; the lock
+        keeps the read-modify-write atomic even on free-threaded Python.
+        """
+        with self._stats_lock:
+            self.stats[counter] += 1
     
     def _increment_stat(self, message_type: str):
         """Increment the appropriate stats counter."""
-        if message_type == "topology":
-            self.stats["topology_sent"] += 1
-        elif message_type == "stats":
-            self.stats["stats_sent"] += 1
-        elif message_type == "alert":
-            self.stats["alerts_sent"] += 1
+        counter = _SENT_COUNTERS.get(message_type)
+        if counter:
+            self._bump(counter)
     
     # =========================================================================
     # PUBLIC API - Called by Controller
@@ -254,14 +321,38 @@ class BackendClient:
                     ]
                 }
         """
-        data = {
-            "type": "stats_update",
-            "timestamp": time.time(),
-            "data": stats
-        }
+        data = {**_STATS_TEMPLATE, "timestamp": time.time(), "data": stats}
+        
+        self._post_async("/api/stats", data, "stats")
+    
+    def send_stats_batch(self, stats_list: list):
+        """
+        Send several traffic statistics updates in one request.
+        
+        Called by: Controller once per monitor tick with every switch's stats
+        
+        The Backend broadcasts each entry as its own stats_update.
+        
+        Args:
+            stats_list: List of stats dictionaries (same format as send_stats)
+        """
+        data = {**_STATS_TEMPLATE, "timestamp": time.time(), "data": {"batch": stats_list}}
         
         self._post_async("/api/stats", data, "stats")
     
+    def _format_alert(self, alert: dict) -> dict:
+        """Convert a Controller alert into the Backend's alert schema."""
+        # Map MAC addresses to IPs if available
+        # The Controller might send MAC addresses, but Backend expects IPs
+        return {
+            "type": "security_alert",
+            "timestamp": alert.get("timestamp", time.time()),
+            "attacker_ip": alert.get("attacker_ip", alert.get("attacker_mac", "unknown")),
+            "target_ip": alert.get("target_ip", alert.get("target_mac", "unknown")),
+            "severity": alert.get("severity", "WARNING"),
+            "action_taken": alert.get("action_taken", "ALERT_ONLY")
+        }
+    
     def send_alert(self, alert: dict):
         """
         Send security alert to Backend.
@@ -282,21 +373,31 @@ class BackendClient:
                     "action_taken": "BLOCK"
                 }
         """
-        # Map MAC addresses to IPs if available
-        # The Controller might send MAC addresses, but Backend expects IPs
-        data = {
-            "type": "security_alert",
-            "timestamp": alert.get("timestamp", time.time()),
-            "attacker_ip": alert.get("attacker_ip", alert.get("attacker_mac", "unknown")),
-            "target_ip": alert.get("target_ip", alert.get("target_mac", "unknown")),
-            "severity": alert.get("severity", "WARNING"),
-            "action_taken": alert.get("action_taken", "ALERT_ONLY")
-        }
+        data = self._format_alert(alert)
         
         self._post_async("/api/alert", data, "alert")
         logging.warning(f"[BACKEND] 🚨 ALERT queued: {data['severity']} - "
                        f"{data['attacker_ip']} -> {data['target_ip']}")
     
+    def send_alerts_batch(self, alerts: list):
+        """
+        Send several security alerts in one request.
+        
+        Called by: Controller once per monitor tick with all new alerts
+        
+        Each alert is saved and broadcast by the Backend exactly as if it
+        had been sent with send_alert.
+        
+        Args:
+            alerts: List of alert dictionaries (same format as send_alert)
+        """
+        data = [self._format_alert(alert) for alert in alerts]
+        
+        self._post_async("/api/alerts", data, "alert")
+        for item in data:
+            logging.warning(f"[BACKEND] 🚨 ALERT queued: {item['severity']} - "
+                           f"{item['attacker_ip']} -> {item['target_ip']}")
+    
     def send_switch_event(self, event_type: str, dpid: int):
         """
         Send switch connect/disconnect event.
@@ -305,15 +406,12 @@ class BackendClient:
             event_type: "connected" or "disconnected"
             dpid: Switch datapath ID
         """
-        # For now, include switch events in stats updates
-        # Could be extended to a dedicated endpoint if needed
+        # Sent on its own. The Controller doesn't use this - it queues switch
+        # events with its batched stats (see _send_switch_event there).
         data = {
-            "type": "stats_update",
+            **_STATS_TEMPLATE,
             "timestamp": time.time(),
-            "data": {
-                "event": "switch_" + event_type,
-                "dpid": dpid
-            }
+            "data": {"event": "switch_" + event_type, "dpid": dpid}
         }
         
         self._post_async("/api/stats", data, "stats")
@@ -366,14 +464,17 @@ class BackendClient:
     
     def fetch_pending_commands(self) -> Optional[Dict[str, Any]]:
         """
-        Poll the Backend for pending commands from the Frontend.
+        Wait for the next pending command from the Frontend (long-poll).
         
         This implements the "mailbox" pattern for manual intervention:
         - Frontend adds commands (e.g., "Block IP 10.0.0.5")
-        - Controller polls this method every ~1 second
+        - Backend holds this request until a command arrives or
+          COMMAND_WAIT_TIMEOUT seconds pass
         - If a command exists, it's returned and removed from queue
         
-        Called by: Controller's monitor loop (every 1 second)
+        Blocks for up to COMMAND_WAIT_TIMEOUT seconds - call it from a
+        background thread (see start_command_listener), never from the
+        Controller's event loop.
         
         Returns:
             dict: Command dict with keys {command, ip, duration} or None
@@ -382,13 +483,14 @@ class BackendClient:
             {"command": "block", "ip": "10.0.0.5", "duration": 60}
             or None if no pending commands
         """
-        if not self.enabled or not self.backend_available:
+        if not self.enabled or time.time() < self._command_retry_at:
             return None
         
         try:
             response = requests.get(
-                f"{self.base_url}/api/control/pending",
-                timeout=REQUEST_TIMEOUT
+                f"{self.base_url}/api/control/wait",
+                params={"timeout": COMMAND_WAIT_TIMEOUT},
+                timeout=COMMAND_WAIT_TIMEOUT + REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -396,29 +498,77 @@ class BackendClient:
                 
                 # Check if there's an actual command
                 if data.get("command"):
-                    logging.info(f"[BACKEND] 📥 Received command: {data['command']} -> {data['ip']}")
+                    logging.info(f"[BACKEND] 📥 Received command: {data['command']} -> {data.get('ip')}")
                     return data
                 
                 # No pending command
                 return None
             else:
+                # Back off so a misbehaving Backend isn't hammered by the listener
                 logging.warning(f"[BACKEND] Command poll failed: HTTP {response.status_code}")
+                self._command_retry_at = time.time() + self.error_backoff
                 return None
                 
         except requests.exceptions.ConnectionError:
             # Backend not available - don't spam logs, just return None
-            self.backend_available = False
-            self.last_error_time = time.time()
+            self._command_retry_at = time.time() + self.error_backoff
             return None
             
         except requests.exceptions.Timeout:
-            # Timeout - backend too slow
+            # Wait expired without a response - not a failure, just re-poll
             return None
             
         except Exception as e:
+            # Bad response body etc. - back off too, or the listener re-polls at once
             logging.error(f"[BACKEND] Command poll error: {e}")
+            self._command_retry_at = time.time() + self.error_backoff
             return None
     
+    def start_command_listener(self, callback):
+        """
+        Start a background thread that long-polls for Frontend commands.
+        
+        Each wait is re-issued as soon as the previous one returns, so an
+        idle Controller makes one request per COMMAND_WAIT_TIMEOUT seconds
+        and commands are delivered without polling delay.
+        
+        Args:
+            callback: Called with each command dict, from the listener thread
+            
+        Returns:
+            threading.Thread or None if the client is disabled
+        """
+        if not self.enabled:
+            return None
+        
+        thread = threading.Thread(
+            target=self._command_loop,
+            args=(callback,),
+            daemon=True
+        )
+        thread.start()
+        return thread
+    
+    def _command_loop(self, callback):
+        """Listener thread body: wait for commands and hand them to callback."""
+        while self.enabled:
+            # Wait out the error backoff before reconnecting
+            delay = self._command_retry_at - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            
+            command = self.fetch_pending_commands()
+            if command:
+                try:
+                    callback(command)
+                except Exception as e:
+                    logging.error(f"[BACKEND] Command handler error: {e}")
+    
+    def _snapshot_stats(self) -> dict:
+        """Return a consistent copy of the stats counters."""
+        with self._stats_lock:
+            return self.stats.copy()
+    
     def get_status(self) -> dict:
         """
         Get current client status for debugging.
@@ -430,7 +580,7 @@ class BackendClient:
             "base_url": self.base_url,
             "enabled": self.enabled,
             "backend_available": self.backend_available,
-            "stats": self.stats.copy()
+            "stats": self._snapshot_stats()
         }
 
 
@@ -478,6 +628,10 @@ class MockBackendClient(BackendClient):
     def fetch_pending_commands(self) -> Optional[Dict[str, Any]]:
         """Mock command polling - always returns None."""
         return None
+    
+    def start_command_listener(self, callback):
+        """Mock listener - no commands ever arrive."""
+        return None
 
 
 # =============================================================================
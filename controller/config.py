@@ -20,6 +20,37 @@ BACKEND_ENABLED = True  # Backend integration enabled
 # How often to poll switches for flow statistics (seconds)
 POLL_INTERVAL = 2
 
+# Adaptive polling: each switch is polled every POLL_INTERVAL_MAX seconds when
+# idle, and more often as its busiest flow's PPS rises (never faster than
+# POLL_INTERVAL_MIN). Idle switches keep the POLL_INTERVAL rate, so a new
+# attack on a quiet switch is seen as quickly as with fixed polling.
+# POLL_INTERVAL also paces housekeeping and status logs.
+# Short-lived flows report themselves when they expire (OFPT_FLOW_REMOVED),
+# so polling only has to keep up with long-lived flows.
+POLL_INTERVAL_MIN = 0.5
+POLL_INTERVAL_MAX = POLL_INTERVAL
+POLL_LOAD_THRESHOLD = 100   # PPS at which a switch's interval is halved
+POLL_LOAD_SMOOTHING = 0.3   # EWMA weight given to the newest reply
+
+# Stats and alerts for the Backend are batched and flushed once per monitor
+# tick - or sooner if a batch reaches BACKEND_BATCH_SIZE entries. A batch is
+# never held longer than BACKEND_BATCH_MAX_AGE seconds.
+BACKEND_BATCH_SIZE = 100
+BACKEND_BATCH_MAX_AGE = 1.0
+
+# Flow stats wait for the backend sender in a ring of this many entries;
+# if the backend falls behind, the oldest entries are dropped
+BACKEND_RING_SIZE = 1024
+
+# A switch is not polled again until its previous stats request is answered,
+# unless the reply is overdue by this long (seconds)
+STATS_REPLY_TIMEOUT = 10
+
+# Navigator paths are cached per (src, dst) host pair and reused until a
+# switch connects/disconnects or any link's load moves by more than this
+# many bits per second since the paths were computed
+PATH_CACHE_REROUTE_BPS = 1_000_000
+
 # Idle timeout for flow rules (seconds) - flows expire after this
 FLOW_IDLE_TIMEOUT = 30
 
@@ -61,19 +92,16 @@ VERBOSE_STATS = True
 # Enable CSV logging (for training data generation)
 CSV_LOGGING = True
 CSV_FILE_PATH = "traffic_data.csv"
+CSV_FLUSH_INTERVAL = 5  # Seconds between flushes of the buffered CSV log
 
 # =============================================================================
 # TOPOLOGY METADATA
 # =============================================================================
 # Used for JSON output to Backend AND for port number calculation!
 #
-# ⚠️  CRITICAL SYNCHRONIZATION WARNING ⚠️
-# This MUST EXACTLY MATCH topo.py in:
-#   1. Host order (which switch each host connects to)
-#   2. Link order (the ORDER links are added determines port numbers)
-#
-# If you modify topo.py, you MUST update this to match!
-# Failure to sync will cause Navigator AI to route to WRONG PORTS!
+# topo.py builds the Mininet network from this (host links first, in host
+# order, then these links in order - the order decides port numbers), so
+# edit the topology here. Only host link bandwidth/delay live in topo.py.
 #
 TOPOLOGY = {
     "switches": [
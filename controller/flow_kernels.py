@@ -0,0 +1,91 @@
+"""
+Sentinet Flow Kernels
+=====================
+Numeric inner loops of the flow statistics pipeline.
+
+compute_rates is compiled with Numba when it is installed; otherwise an
+equivalent NumPy version is used. Both take the same arrays and give the
+same results, so callers don't need to know which one is active. That
+includes repeated slots in idxs: every row's rate is taken against the
+counters from before the call, and the last row for a slot is the one
+stored for the next call.
+"""
+
+import logging
+
+import numpy as np
+
+# Try to import Numba (optional - NumPy fallback below)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    logging.info("Numba not installed. Flow kernels use NumPy.")
+
+
+def _compute_rates_numpy(idxs, cur_pkts, cur_bytes, timestamp,
+                         prev_pkts, prev_bytes, prev_ts, out_pps, out_bps):
+    """Same as _compute_rates_loop, as array operations (gather, divide, clip, scatter)."""
+    delta_time = timestamp - prev_ts[idxs]
+    valid = delta_time > 0  # False for new flows (NaN) and stale samples
+
+    out_pps[:] = 0.0
+    out_bps[:] = 0.0
+    np.divide(cur_pkts - prev_pkts[idxs], delta_time, out=out_pps, where=valid)
+    np.divide((cur_bytes - prev_bytes[idxs]) * 8, delta_time, out=out_bps, where=valid)
+
+    # Ensure non-negative (counters can reset if a flow is re-installed)
+    np.clip(out_pps, 0.0, None, out=out_pps)
+    np.clip(out_bps, 0.0, None, out=out_bps)
+
+    # Update history from the last row of each slot - repeated fancy-index
+    # assignment has no guaranteed order, so pick those rows explicitly
+    _, last_from_end = np.unique(idxs[::-1], return_index=True)
+    last = idxs.shape[0] - 1 - last_from_end
+    prev_pkts[idxs[last]] = cur_pkts[last]
+    prev_bytes[idxs[last]] = cur_bytes[last]
+    prev_ts[idxs[last]] = timestamp
+
+
+def _compute_rates_loop(idxs, cur_pkts, cur_bytes, timestamp,
+                        prev_pkts, prev_bytes, prev_ts, out_pps, out_bps):
+    """
+    Compute instant PPS/BPS from counter deltas and store the new counters.
+    
+    One pass computes the rates, a second stores the counters, so a slot
+    repeated in idxs behaves as in the NumPy version. This is the version
+    compiled by Numba.
+    
+    Args:
+        idxs: History slot of each flow (intp)
+        cur_pkts, cur_bytes: Current counters per flow (float64)
+        timestamp: Time of the current sample
+        prev_pkts, prev_bytes, prev_ts: History arrays, updated in place
+        out_pps, out_bps: Output arrays aligned with idxs (float64)
+    """
+    for i in range(idxs.shape[0]):
+        slot = idxs[i]
+        delta_time = timestamp - prev_ts[slot]
+
+        # NaN (no previous sample) fails this comparison too
+        if delta_time > 0:
+            out_pps[i] = max((cur_pkts[i] - prev_pkts[slot]) / delta_time, 0.0)
+            out_bps[i] = max((cur_bytes[i] - prev_bytes[slot]) * 8 / delta_time, 0.0)
+        else:
+            out_pps[i] = 0.0
+            out_bps[i] = 0.0
+
+    for i in range(idxs.shape[0]):
+        slot = idxs[i]
+        prev_pkts[slot] = cur_pkts[i]
+        prev_bytes[slot] = cur_bytes[i]
+        prev_ts[slot] = timestamp
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath: it assumes no NaNs, and NaN marks "no previous sample".
+    # No parallel: a reply holds too few flows to pay for thread start-up.
+    compute_rates = njit(cache=True, nogil=True)(_compute_rates_loop)
+else:
+    compute_rates = _compute_rates_numpy
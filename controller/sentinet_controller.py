@@ -18,21 +18,95 @@ from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER, DEAD_DISPATCHER, set_ev_cls
 from ryu.ofproto import ofproto_v1_3
-from ryu.lib.packet import packet, ethernet, ether_types, ipv4, arp
+from ryu.lib.packet import ether_types, ipv4, arp
 from ryu.lib import hub
 
 import time
-import os
 import logging
+import struct
+import threading
+import heapq
+from functools import lru_cache
+
+import numpy as np
 
 # Local imports
 from config import (
-    POLL_INTERVAL, ALERT_COOLDOWN, TOPOLOGY,
-    VERBOSE_STATS, CSV_LOGGING, CSV_FILE_PATH,
+    POLL_INTERVAL, POLL_INTERVAL_MIN, POLL_INTERVAL_MAX,
+    POLL_LOAD_THRESHOLD, POLL_LOAD_SMOOTHING,
+    STATS_REPLY_TIMEOUT, PATH_CACHE_REROUTE_BPS, BACKEND_BATCH_SIZE, BACKEND_BATCH_MAX_AGE,
+    BACKEND_RING_SIZE,
+    ALERT_COOLDOWN, TOPOLOGY,
+    VERBOSE_STATS, CSV_LOGGING, CSV_FILE_PATH, CSV_FLUSH_INTERVAL,
     BACKEND_ENABLED, SENTINEL_ENABLED, NAVIGATOR_ENABLED
 )
-from ai_interface import SentinelAI, NavigatorAI, format_flow_for_ai, prepare_navigator_input
+from ai_interface import SentinelAI, NavigatorAI, FLOW_DTYPE, format_flows_for_ai, prepare_navigator_input
 from backend_client import BackendClient, MockBackendClient
+from flow_kernels import compute_rates
+
+
+# Column header written when the CSV log is created
+CSV_HEADER = ("timestamp,dpid,src,dst,packet_count,byte_count,"
+              "duration_sec,pps,bps,avg_pkt_size\n")
+
+# Ethernet header: dst MAC (6 bytes), src MAC (6 bytes), EtherType
+ETH_HEADER = struct.Struct('!6s6sH')
+
+# Integer form of every known host MAC, precomputed from the static topology.
+# Hashing a small int is cheaper than hashing a 17-character MAC string.
+MAC_TO_INT = {host['mac']: int(host['mac'].replace(':', ''), 16) for host in TOPOLOGY['hosts']}
+
+
+def mac_to_int(mac: str) -> int:
+    """Convert a MAC string to its 48-bit integer form (table lookup for known hosts)."""
+    mac_int = MAC_TO_INT.get(mac)
+    if mac_int is None:
+        mac_int = int(mac.replace(':', ''), 16)
+    return mac_int
+
+
+@lru_cache(maxsize=4096)
+def mac_bytes_to_str(mac: bytes) -> str:
+    """Format a raw 6-byte MAC as 'aa:bb:cc:dd:ee:ff' (cached - few distinct MACs)."""
+    return mac.hex(':')
+
+
+def mac_bytes_to_int(mac: bytes) -> int:
+    """Convert a raw 6-byte MAC straight to its 48-bit integer form."""
+    return int.from_bytes(mac, 'big')
+
+
+@lru_cache(maxsize=4096)
+def int_to_mac(mac_int: int) -> str:
+    """Format a 48-bit integer MAC as 'aa:bb:cc:dd:ee:ff' (for logs/backend only)."""
+    return mac_int.to_bytes(6, 'big').hex(':')
+
+
+# FLOW_DTYPE with the float32 fields widened to float64, for flows_to_dicts
+_FLOAT32_FIELDS = tuple(name for name in FLOW_DTYPE.names if FLOW_DTYPE[name] == np.float32)
+_FLOW_DTYPE_OUT = np.dtype([(name, 'f8' if name in _FLOAT32_FIELDS else FLOW_DTYPE[name])
+                            for name in FLOW_DTYPE.names])
+
+
+def flows_to_dicts(flows: np.ndarray) -> list:
+    """Convert a FLOW_DTYPE array to the dictionary form used by the backend and API."""
+    # Round the float32 fields - widened as-is they'd carry binary
+    # artifacts into the JSON (12578.0859375 instead of 12578.086)
+    rows = flows.astype(_FLOW_DTYPE_OUT)
+    for name in _FLOAT32_FIELDS:
+        np.round(rows[name], 3, out=rows[name])
+    return [
+        {
+            'timestamp': ts, 'dpid': dpid,
+            'src_mac': int_to_mac(src), 'dst_mac': int_to_mac(dst),
+            'in_port': in_port, 'out_port': out_port,
+            'packet_count': packets, 'byte_count': octets,
+            'duration_sec': duration, 'pps': pps, 'bps': bps,
+            'avg_pkt_size': avg_pkt_size,
+        }
+        for (ts, dpid, src, dst, in_port, out_port, packets, octets,
+             duration, pps, bps, avg_pkt_size) in rows.tolist()
+    ]
 
 
 class SentinetController(app_manager.RyuApp):
@@ -51,10 +125,40 @@ class SentinetController(app_manager.RyuApp):
         # =================================================================
         # Core Data Structures
         # =================================================================
-        self.mac_to_port = {}      # {dpid: {mac: port}}
+        self.mac_to_port = {}      # {dpid: {mac_int: port}}
         self.datapaths = {}        # {dpid: datapath} - connected switches
-        self.flow_stats = {}       # {dpid: [flow_stats]} - latest stats per switch
-        self.prev_stats = {}       # {(dpid, src, dst): (packets, bytes, time)} - for delta calculation
+        self.flow_stats = {}       # {dpid: FLOW_DTYPE array} - latest stats per switch
+        
+        # Static topology lookups, built once
+        self._host_by_mac = {host['mac']: host for host in TOPOLOGY['hosts']}
+        self._host_by_ip = {host['ip']: host for host in TOPOLOGY['hosts']}
+        self._mac_to_switch = {host['mac']: host['switch'] for host in TOPOLOGY['hosts']}
+        self._build_switch_port_map()
+        
+        # Previous counters for delta (instant PPS/BPS) calculation, stored as
+        # parallel arrays. Each (dpid, in_port, src, dst) flow key owns one slot -
+        # the same fields learned flows match on, so a reply never repeats a key.
+        self._key_to_idx = {}      # {(dpid, in_port, src, dst): slot}
+        self._prev_pkts = np.zeros(0, dtype=np.float64)
+        self._prev_bytes = np.zeros(0, dtype=np.float64)
+        self._prev_ts = np.zeros(0, dtype=np.float64)
+        
+        # Outstanding stats requests {dpid: request_time}. Touched by both the
+        # monitor loop and the reply handler, which run in different hub threads.
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Adaptive polling state
+        self._next_poll_at = {}    # {dpid: time the switch is next due for polling}
+        self._switch_load = {}     # {dpid: EWMA of the busiest flow's PPS}
+        
+        # Navigator routes, precomputed per host pair:
+        # {(src_int, dst_int): {dpid: out_port}}, None = port of the destination host
+        self._path_port_cache = {}
+        
+        # Navigator graph, rebuilt only after link usage has changed
+        self._link_usage_version = 0  # Bumped by every _update_link_usage
+        self._graph_cache = (None, None)  # (link usage version, graph)
         
         # =================================================================
         # AI Models
@@ -77,17 +181,42 @@ class SentinetController(app_manager.RyuApp):
         else:
             self.backend = MockBackendClient()
         
+        # Manual block commands from the Frontend (long-polled in the background)
+        self.backend.start_command_listener(self._on_backend_command)
+        
+        # Flow stats for the backend, handed from the reply handlers to the
+        # _backend_drain thread through a fixed ring: the handlers write at
+        # tail, the drain thread reads from head (head == tail: empty)
+        self._backend_ring = [None] * BACKEND_RING_SIZE
+        self._ring_head = 0
+        self._ring_tail = 0
+        self._ring_ready = hub.Event()  # Set once a full batch is waiting
+        
+        # Outgoing alerts, sent as one request by _flush_alerts
+        self._alert_batch = []
+        
         # =================================================================
         # Attack Tracking
         # =================================================================
-        self.active_alerts = {}    # {(src, dst): expiry_timestamp}
-        self.blocked_flows = set() # Set of (src, dst) tuples currently blocked
+        self.active_alerts = {}    # {(src_int, dst_int): expiry_timestamp}
+        self._alert_heap = []      # Min-heap of (expiry_timestamp, key); stale entries skipped
+        self.blocked_flows = set() # Set of (src_int, dst_int) tuples currently blocked
         self.recent_paths = []     # Track recent Navigator paths
         
+        # =================================================================
+        # CSV Logging (one long-lived, buffered handle)
+        # =================================================================
+        self._csv_fp = None
+        if CSV_LOGGING:
+            self._csv_fp = open(CSV_FILE_PATH, "a", buffering=1 << 20)
+            if self._csv_fp.tell() == 0:
+                self._csv_fp.write(CSV_HEADER)
+        
         # =================================================================
         # Start Background Threads  
         # =================================================================
         self.monitor_thread = hub.spawn(self._monitor_loop)
+        self.drain_thread = hub.spawn(self._backend_drain)
         self.logger.info("[SENTINET] Controller initialized")
 
     # =========================================================================
@@ -111,7 +240,7 @@ class SentinetController(app_manager.RyuApp):
         self.logger.info(f"[SWITCH] s{dpid} connected")
         
         # Notify backend of switch connection
-        self.backend.send_switch_event("connected", dpid)
+        self._send_switch_event("connected", dpid)
     
     @set_ev_cls(ofp_event.EventOFPStateChange, [MAIN_DISPATCHER, CONFIG_DISPATCHER, DEAD_DISPATCHER])
     def state_change_handler(self, ev):
@@ -122,6 +251,7 @@ class SentinetController(app_manager.RyuApp):
         if ev.state == MAIN_DISPATCHER:
             if dpid not in self.datapaths:
                 self.datapaths[dpid] = datapath
+                self._path_port_cache.clear()
                 self.logger.info(f"[SWITCH] s{dpid} registered")
                 
                 # Send topology to backend when first switch connects
@@ -134,8 +264,13 @@ class SentinetController(app_manager.RyuApp):
         elif ev.state == DEAD_DISPATCHER:
             if dpid in self.datapaths:
                 del self.datapaths[dpid]
+                self._path_port_cache.clear()
+                with self._inflight_lock:
+                    self._inflight.pop(dpid, None)
+                self._next_poll_at.pop(dpid, None)
+                self._switch_load.pop(dpid, None)
                 self.logger.info(f"[SWITCH] s{dpid} disconnected")
-                self.backend.send_switch_event("disconnected", dpid)
+                self._send_switch_event("disconnected", dpid)
 
     # =========================================================================
     # PACKET HANDLING (L2 Learning Switch)
@@ -152,33 +287,41 @@ class SentinetController(app_manager.RyuApp):
         dpid = datapath.id
         in_port = msg.match['in_port']
         
-        # Parse packet
-        pkt = packet.Packet(msg.data)
-        eth = pkt.get_protocol(ethernet.ethernet)
+        # Parse only the Ethernet header - the upper layers are never used,
+        # so skip building a full ryu packet.Packet for every packet-in
+        if len(msg.data) < ETH_HEADER.size:
+            return  # Truncated frame - no Ethernet header to read
+        dst_bytes, src_bytes, ethertype = ETH_HEADER.unpack_from(msg.data)
         
         # Ignore LLDP and IPv6
-        if eth.ethertype == ether_types.ETH_TYPE_LLDP:
+        if ethertype == ether_types.ETH_TYPE_LLDP:
             return
-        if eth.ethertype == 0x86dd:  # IPv6
+        if ethertype == 0x86dd:  # IPv6
             return
         
-        src_mac = eth.src
-        dst_mac = eth.dst
+        # All tables are keyed on 48-bit integer MACs
+        src_int = mac_bytes_to_int(src_bytes)
+        dst_int = mac_bytes_to_int(dst_bytes)
         
         # Initialize MAC table for this switch
-        self.mac_to_port.setdefault(dpid, {})
+        mac_table = self.mac_to_port.setdefault(dpid, {})
         
         # Learn source MAC
-        self.mac_to_port[dpid][src_mac] = in_port
+        mac_table[src_int] = in_port
         
         # Check if this flow is blocked
-        if self._is_blocked(src_mac, dst_mac):
-            self.logger.warning(f"[BLOCK] Dropping packet from blocked flow: {src_mac} -> {dst_mac}")
+        if self._is_blocked(src_int, dst_int):
+            self.logger.warning(f"[BLOCK] Dropping packet from blocked flow: "
+                                f"{int_to_mac(src_int)} -> {int_to_mac(dst_int)}")
             return
         
+        # String form is only needed for OFPMatch and the Navigator
+        src_mac = mac_bytes_to_str(src_bytes)
+        dst_mac = mac_bytes_to_str(dst_bytes)
+        
         # Determine output port
-        if dst_mac in self.mac_to_port[dpid]:
-            out_port = self.mac_to_port[dpid][dst_mac]
+        if dst_int in mac_table:
+            out_port = mac_table[dst_int]
         else:
             # Unknown destination - use Navigator AI or flood
             out_port = self._get_output_port(dpid, src_mac, dst_mac, ofproto)
@@ -189,12 +332,16 @@ class SentinetController(app_manager.RyuApp):
         if out_port != ofproto.OFPP_FLOOD:
             match = parser.OFPMatch(in_port=in_port, eth_dst=dst_mac, eth_src=src_mac)
             
+            # Ask the switch to report final counters when the flow expires
+            # (see flow_removed_handler) so short flows need no polling
+            flags = ofproto.OFPFF_SEND_FLOW_REM
+            
             # Use short idle timeout for Navigator-routed flows (adaptive routing)
             # This forces re-evaluation of path when traffic patterns change
             if NAVIGATOR_ENABLED:
-                self._add_flow(datapath, 1, match, actions, idle_timeout=5)
+                self._add_flow(datapath, 1, match, actions, idle_timeout=5, flags=flags)
             else:
-                self._add_flow(datapath, 1, match, actions)
+                self._add_flow(datapath, 1, match, actions, flags=flags)
         
         # Send packet out
         data = None
@@ -217,18 +364,27 @@ class SentinetController(app_manager.RyuApp):
         Called by: packet_in_handler
         
         Logic:
-        1. Ask Navigator AI for path (list of switch IDs)
-        2. Find current switch position in path
-        3. Determine next hop switch
-        4. Look up port connecting to next hop
+        1. Reuse the cached next-hop table for this host pair, if any
+        2. Otherwise ask Navigator AI for path (list of switch IDs)
+           and turn it into a {dpid: out_port} table once
+        3. Look up this switch's port in the table
         """
         if NAVIGATOR_ENABLED:
+            flow_key = (mac_to_int(src_mac), mac_to_int(dst_mac))
+            hops = self._path_port_cache.get(flow_key)
+            if hops is not None:
+                return self._hop_port(dpid, hops, flow_key[1], ofproto.OFPP_FLOOD)
+            
             # Ask Navigator AI for optimal path
             graph = self.get_network_graph()
             path = self.navigator.get_path(src_mac, dst_mac, graph)
             
             if path:
-                out_port = self._path_to_port(dpid, path, dst_mac)
+                hops = self._path_to_ports(path)
+                if not self._path_port_cache:
+                    self._routed_link_usage = self._link_usage.copy()
+                self._path_port_cache[flow_key] = hops
+                out_port = self._hop_port(dpid, hops, flow_key[1], None)
                 if out_port is not None:
                     self.logger.debug(f"[NAVIGATOR] Path {path}, using port {out_port}")
                     return out_port
@@ -242,36 +398,34 @@ class SentinetController(app_manager.RyuApp):
         # Fallback: flood to all ports
         return ofproto.OFPP_FLOOD
     
-    def _path_to_port(self, dpid: int, path: list, dst_mac: str) -> int:
+    def _path_to_ports(self, path: list) -> dict:
         """
-        Convert a path from Navigator AI to an output port.
+        Convert a path from Navigator AI to a next-hop table.
         
         Args:
-            dpid: Current switch datapath ID
             path: List of switch IDs from Navigator, e.g., ["s3", "s2", "s1", "s5"]
-            dst_mac: Destination MAC address
             
         Returns:
-            Output port number, or None if cannot determine
+            Dictionary {dpid: out_port}. The last switch maps to None - the
+            destination host is directly connected, and its port is learned.
         """
-        current_switch = f"s{dpid}"
-        
-        # Find current switch in path
-        if current_switch not in path:
-            return None
-        
-        current_idx = path.index(current_switch)
-        
-        # If we're at the last switch in path, the host is directly connected
-        if current_idx == len(path) - 1:
-            # Look up which port the destination host is on
-            if dpid in self.mac_to_port and dst_mac in self.mac_to_port[dpid]:
-                return self.mac_to_port[dpid][dst_mac]
-            return None
-        
-        # Otherwise, find port to next hop switch
-        next_switch = path[current_idx + 1]
-        return self._get_port_to_switch(dpid, next_switch)
+        hops = {}
+        for current_switch, next_switch in zip(path, path[1:]):
+            dpid = int(current_switch[1:])  # "s3" -> 3
+            hops[dpid] = self._get_port_to_switch(dpid, next_switch)
+        hops[int(path[-1][1:])] = None
+        return hops
+    
+    def _hop_port(self, dpid: int, hops: dict, dst_int: int, default):
+        """Output port for dpid from a next-hop table, or default if it has none."""
+        if dpid not in hops:
+            return default
+        
+        out_port = hops[dpid]
+        if out_port is None:
+            # Last switch in path - look up which port the destination host is on
+            out_port = self.mac_to_port.get(dpid, {}).get(dst_int)
+        return default if out_port is None else out_port
     
     def _get_port_to_switch(self, from_dpid: int, to_switch_id: str) -> int:
         """
@@ -289,9 +443,6 @@ class SentinetController(app_manager.RyuApp):
         from_switch = f"s{from_dpid}"
         
         # Search in switch_ports mapping (built from topology)
-        if not hasattr(self, '_switch_ports'):
-            self._build_switch_port_map()
-        
         key = (from_switch, to_switch_id)
         if key in self._switch_ports:
             return self._switch_ports[key]
@@ -337,6 +488,18 @@ class SentinetController(app_manager.RyuApp):
             self._switch_ports[(from_sw, to_sw)] = from_port
             self._switch_ports[(to_sw, from_sw)] = to_port
         
+        # Link utilization accumulators: each directed link gets a slot, and
+        # (dpid, out_port) maps straight to the slot of the link it feeds
+        self._link_keys = list(self._switch_ports.keys())
+        self._port_to_link = {
+            (int(from_sw[1:]), port): idx  # "s1" -> 1
+            for idx, ((from_sw, to_sw), port) in enumerate(self._switch_ports.items())
+        }
+        self._link_usage = np.zeros(len(self._link_keys))         # Total bps per link
+        self._link_flow_count = np.zeros(len(self._link_keys), dtype=np.int64)
+        self._switch_link_usage = {}  # {dpid: (bps, flow_count)} - latest contribution per switch
+        self._routed_link_usage = self._link_usage.copy()  # Load when cached paths were computed
+        
         self.logger.info(f"[NAVIGATOR] Switch port map built: {self._switch_ports}")
     
     def _get_host_switch(self, mac: str) -> str:
@@ -349,16 +512,13 @@ class SentinetController(app_manager.RyuApp):
         Returns:
             Switch ID (e.g., "s3") or None
         """
-        host = self.get_host_by_mac(mac)
-        if host:
-            return host['switch']
-        return None
+        return self._mac_to_switch.get(mac)
 
     # =========================================================================
     # FLOW MANAGEMENT
     # =========================================================================
     
-    def _add_flow(self, datapath, priority, match, actions, idle_timeout=0, hard_timeout=0):
+    def _add_flow(self, datapath, priority, match, actions, idle_timeout=0, hard_timeout=0, flags=0):
         """Install a flow rule on a switch."""
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
@@ -370,7 +530,8 @@ class SentinetController(app_manager.RyuApp):
             match=match,
             instructions=inst,
             idle_timeout=idle_timeout,
-            hard_timeout=hard_timeout
+            hard_timeout=hard_timeout,
+            flags=flags
         )
         datapath.send_msg(mod)
     
@@ -383,56 +544,146 @@ class SentinetController(app_manager.RyuApp):
         self.logger.warning(f"[BLOCK] Blocking flow: {src_mac} -> {dst_mac} for {duration}s")
         
         # Add to blocked set
-        self.blocked_flows.add((src_mac, dst_mac))
+        self.blocked_flows.add((mac_to_int(src_mac), mac_to_int(dst_mac)))
         
-        # Install DROP rule on all switches
-        for dpid, datapath in self.datapaths.items():
+        # Install DROP rule on all switches. The FlowMod is identical for
+        # every switch, so it is serialized once per OpenFlow version and
+        # the same bytes are queued on each connection.
+        drop_bufs = {}
+        for datapath in self.datapaths.values():
             parser = datapath.ofproto_parser
-            match = parser.OFPMatch(eth_src=src_mac, eth_dst=dst_mac)
-            actions = []  # Empty actions = DROP
-            
-            self._add_flow(datapath, priority=100, match=match, actions=actions,
-                          hard_timeout=duration)
+            buf = drop_bufs.get(parser)
+            if buf is None:
+                match = parser.OFPMatch(eth_src=src_mac, eth_dst=dst_mac)
+                actions = []  # Empty actions = DROP
+                inst = [parser.OFPInstructionActions(datapath.ofproto.OFPIT_APPLY_ACTIONS, actions)]
+                mod = parser.OFPFlowMod(datapath=datapath, priority=100, match=match,
+                                        instructions=inst, hard_timeout=duration)
+                mod.set_xid(0)  # Shared by all switches - errors are logged, never matched
+                mod.serialize()
+                buf = drop_bufs[parser] = bytes(mod.buf)
+            datapath.send(buf)
         
         # Schedule unblock
         hub.spawn_after(duration, self._unblock_flow, src_mac, dst_mac)
     
+    def _block_ip(self, ip: str, duration: int = 60):
+        """
+        Block all traffic from a host, identified by IP.
+        
+        Called by: _on_backend_command for a manual block from the Frontend
+        """
+        host = self._host_by_ip.get(ip)
+        if host is None:
+            self.logger.warning(f"[BLOCK] Unknown IP {ip} - block command ignored")
+            return
+        
+        for other in TOPOLOGY['hosts']:
+            if other is not host:
+                self._block_flow(host['mac'], other['mac'], duration)
+    
+    def _on_backend_command(self, command: dict):
+        """
+        Execute a command queued by the Frontend.
+        
+        Called by: the Backend client's command listener thread
+        """
+        if command.get('command') == 'block' and command.get('ip'):
+            self._block_ip(command['ip'], int(command.get('duration') or 60))
+        else:
+            self.logger.warning(f"[BACKEND] Unsupported command ignored: {command}")
+    
     def _unblock_flow(self, src_mac: str, dst_mac: str):
         """Remove block on a flow after timeout."""
-        self.blocked_flows.discard((src_mac, dst_mac))
+        self.blocked_flows.discard((mac_to_int(src_mac), mac_to_int(dst_mac)))
         self.logger.info(f"[UNBLOCK] Flow unblocked: {src_mac} -> {dst_mac}")
     
-    def _is_blocked(self, src_mac: str, dst_mac: str) -> bool:
-        """Check if a flow is currently blocked."""
-        return (src_mac, dst_mac) in self.blocked_flows
+    def _is_blocked(self, src_int: int, dst_int: int) -> bool:
+        """
+        Check if a flow is currently blocked.
+        
+        Called on every packet-in; almost always answers False, usually
+        while nothing is blocked at all - so check that before building
+        and hashing the key tuple.
+        """
+        return bool(self.blocked_flows) and (src_int, dst_int) in self.blocked_flows
 
     # =========================================================================
     # MONITORING & STATISTICS
     # =========================================================================
     
     def _monitor_loop(self):
-        """Background thread: Poll switches for stats every POLL_INTERVAL seconds."""
+        """
+        Background thread: Poll each switch for stats when it is due.
+        
+        Busy switches are polled more often than idle ones (see _poll_interval);
+        the loop sleeps until the next switch is due.
+        """
         # Connect to backend
         self.backend.connect()
+        last_status_log = 0.0
+        last_csv_flush = time.time()
         
         while True:
+            now = time.time()
+            
             # Clean expired alerts
             self._clean_expired_alerts()
             
-            # Request stats from all switches
-            for dpid, dp in self.datapaths.items():
-                self._request_stats(dp)
+            # Request stats from switches that are due
+            for dpid, dp in list(self.datapaths.items()):
+                if now >= self._next_poll_at.get(dpid, 0.0):
+                    self._request_stats(dp)
+                    self._next_poll_at[dpid] = now + self._poll_interval(dpid)
             
-            if NAVIGATOR_ENABLED:
+            if NAVIGATOR_ENABLED and now - last_status_log >= POLL_INTERVAL:
+                last_status_log = now
                 status = self.navigator.get_status()
                 self.logger.info(f"[NAVIGATOR] Status: {status}")
                 if self.recent_paths:
                     self.logger.info(f"[NAVIGATOR] Recent paths: {', '.join(self.recent_paths[-5:])}")
             
-            hub.sleep(POLL_INTERVAL)
+            # Send alerts collected since the last tick
+            self._flush_alerts()
+            
+            # The CSV log is buffered; push it to disk every CSV_FLUSH_INTERVAL
+            if self._csv_fp and now - last_csv_flush >= CSV_FLUSH_INTERVAL:
+                last_csv_flush = now
+                self._csv_fp.flush()
+            
+            # Sleep until the next switch is due (or the alerts get too old)
+            next_due = min(
+                (self._next_poll_at[dpid] for dpid in self.datapaths if dpid in self._next_poll_at),
+                default=now + POLL_INTERVAL
+            )
+            next_due = min(next_due, now + BACKEND_BATCH_MAX_AGE)
+            hub.sleep(max(0.0, next_due - time.time()))
+    
+    def _poll_interval(self, dpid: int) -> float:
+        """
+        Polling interval for a switch based on its recent traffic load.
+        
+        Idle switches are polled every POLL_INTERVAL_MAX seconds; the interval
+        shrinks as load grows, down to POLL_INTERVAL_MIN.
+        """
+        load = self._switch_load.get(dpid, 0.0)
+        interval = POLL_INTERVAL_MAX / (1.0 + load / POLL_LOAD_THRESHOLD)
+        return min(POLL_INTERVAL_MAX, max(POLL_INTERVAL_MIN, interval))
     
     def _request_stats(self, datapath):
-        """Send flow stats request to a switch."""
+        """
+        Send flow stats request to a switch.
+        
+        Skips switches whose previous request is still unanswered, so a slow
+        or dead switch can't accumulate a backlog of stats requests.
+        """
+        now = time.time()
+        with self._inflight_lock:
+            sent_at = self._inflight.get(datapath.id)
+            if sent_at is not None and now - sent_at < STATS_REPLY_TIMEOUT:
+                return
+            self._inflight[datapath.id] = now
+        
         parser = datapath.ofproto_parser
         req = parser.OFPFlowStatsRequest(datapath)
         datapath.send_msg(req)
@@ -444,63 +695,38 @@ class SentinetController(app_manager.RyuApp):
         dpid = ev.msg.datapath.id
         timestamp = ev.timestamp
         
+        # Switch answered - it may be polled again
+        with self._inflight_lock:
+            self._inflight.pop(dpid, None)
+        
         # Filter to priority 1 flows (host traffic, not table-miss)
         host_flows = [flow for flow in body if flow.priority == 1]
         
-        # Format flows for processing
-        # Format flows for processing
-        formatted_flows = []
-        for stat in host_flows:
-            flow_data = format_flow_for_ai(stat, dpid, timestamp)
-            
-            # --- FIX: Calculate Instant PPS (Delta) instead of Lifetime Average ---
-            
-            # Key to identify the unique flow
-            src = stat.match['eth_src']
-            dst = stat.match['eth_dst']
-            key = (dpid, src, dst)
-            
-            current_packets = stat.packet_count
-            current_bytes = stat.byte_count
-            current_time = timestamp
-            
-            pps = 0.0
-            bps = 0.0
-            
-            if key in self.prev_stats:
-                prev_packets, prev_bytes, prev_time = self.prev_stats[key]
-                
-                delta_packets = current_packets - prev_packets
-                delta_bytes = current_bytes - prev_bytes
-                delta_time = current_time - prev_time
-                
-                if delta_time > 0:
-                    pps = delta_packets / delta_time
-                    bps = (delta_bytes * 8) / delta_time
-                    
-                    # Ensure non-negative (counters might vary if switch sends out-of-order stats, though unlikely in single thread)
-                    pps = max(0.0, pps)
-                    bps = max(0.0, bps)
-            
-            # Update history
-            self.prev_stats[key] = (current_packets, current_bytes, current_time)
-            
-            # Override the "Lifetime" stats from format_flow_for_ai
-            flow_data['pps'] = pps
-            flow_data['bps'] = bps
-            
-            # -------------------------------------------------------------
-            
-            formatted_flows.append(flow_data)
-            
-            # Run through Sentinel AI
-            self._check_for_attack(flow_data)
+        # Format flows for processing (one structured array row per flow)
+        flows = format_flows_for_ai(host_flows, dpid, timestamp)
+        
+        # Instant PPS/BPS (delta since the previous reply) instead of the
+        # lifetime average from format_flows_for_ai - one vectorized pass
+        pps_arr, bps_arr = self._compute_flow_rates(dpid, flows, timestamp)
+        
+        # Track switch load (busiest flow) for adaptive polling
+        peak_pps = float(pps_arr.max()) if len(pps_arr) else 0.0
+        prev_load = self._switch_load.get(dpid, peak_pps)
+        self._switch_load[dpid] = (POLL_LOAD_SMOOTHING * peak_pps
+                                   + (1.0 - POLL_LOAD_SMOOTHING) * prev_load)
+        
+        flows['pps'] = pps_arr
+        flows['bps'] = bps_arr
+        
+        # Run through Sentinel AI (one batched prediction per reply)
+        self._check_for_attacks(flows, pps_arr, bps_arr)
         
         # Store latest stats
-        self.flow_stats[dpid] = formatted_flows
+        self.flow_stats[dpid] = flows
+        self._update_link_usage(dpid, flows, bps_arr)
         
         # Send to backend
-        self._send_stats_to_backend(dpid, formatted_flows)
+        self._send_stats_to_backend(dpid, flows)
         
         # Update Navigator AI with link utilization (for Q-Learning)
         if NAVIGATOR_ENABLED:
@@ -508,94 +734,186 @@ class SentinetController(app_manager.RyuApp):
             self.navigator.update_link_stats(link_stats)
         
         # Log to CSV if enabled
-        if CSV_LOGGING:
-            self._log_to_csv(formatted_flows)
+        if self._csv_fp:
+            self._log_to_csv(flows)
         
         # Console output if verbose
-        if VERBOSE_STATS and formatted_flows:
-            self._print_stats(dpid, formatted_flows)
+        if VERBOSE_STATS and len(flows):
+            self._print_stats(dpid, flows)
+
+    @set_ev_cls(ofp_event.EventOFPFlowRemoved, MAIN_DISPATCHER)
+    def flow_removed_handler(self, ev):
+        """
+        Handle a learned flow expiring on a switch (push-based statistics).
+        
+        Flows installed with OFPFF_SEND_FLOW_REM report their final counters
+        here, so flows that end between polls are still analysed without a
+        stats request/reply round-trip.
+        """
+        msg = ev.msg
+        if msg.priority != 1:
+            return
+        
+        dpid = msg.datapath.id
+        
+        # Lifetime averages are exact for a finished flow - no delta needed.
+        # format_flows_for_ai reports bytes/s; the polled path uses bits/s.
+        flows = format_flows_for_ai([msg], dpid, time.time())
+        flows['bps'] *= 8
+        
+        # A re-installed flow restarts its counters - forget the old sample
+        idx = self._key_to_idx.get((dpid, int(flows['in_port'][0]),
+                                    int(flows['src'][0]), int(flows['dst'][0])))
+        if idx is not None:
+            self._prev_ts[idx] = np.nan
+        
+        self._check_for_attacks(flows, flows['pps'].astype(np.float64),
+                                flows['bps'].astype(np.float64))
+        # Tagged: one expired flow, not a full snapshot of the switch's flows
+        self._send_stats_to_backend(dpid, flows, extra={"event": "flow_removed"})
+        
+        if self._csv_fp:
+            self._log_to_csv(flows)
+    
+    def _flow_slot(self, key: tuple) -> int:
+        """Return the previous-counter slot for a flow key, growing the arrays if needed."""
+        idx = self._key_to_idx.get(key)
+        if idx is None:
+            idx = len(self._key_to_idx)
+            self._key_to_idx[key] = idx
+            
+            if idx >= len(self._prev_ts):
+                grow = max(64, len(self._prev_ts))
+                self._prev_pkts = np.concatenate([self._prev_pkts, np.zeros(grow)])
+                self._prev_bytes = np.concatenate([self._prev_bytes, np.zeros(grow)])
+                # NaN timestamp marks "no previous sample" (rate stays 0)
+                self._prev_ts = np.concatenate([self._prev_ts, np.full(grow, np.nan)])
+        return idx
+    
+    def _compute_flow_rates(self, dpid: int, flows: np.ndarray, timestamp: float):
+        """
+        Compute instant PPS/BPS for a switch's flows from counter deltas.
+        
+        Gathers the previous counters for every flow, computes all rates in
+        one kernel call (Numba-compiled when available), then stores the
+        current counters for the next reply. Flows seen for the first time
+        have no delta yet and get their lifetime average instead, so a new
+        attack is visible (and raises the switch load) on its first sample.
+        
+        Returns:
+            Tuple of (pps, bps) float64 arrays aligned with flows
+        """
+        n = len(flows)
+        idxs = np.fromiter(
+            (self._flow_slot((dpid, in_port, src, dst))
+             for in_port, src, dst in zip(flows['in_port'].tolist(), flows['src'].tolist(),
+                                          flows['dst'].tolist())),
+            dtype=np.intp, count=n
+        )
+        cur_pkts = flows['packet_count'].astype(np.float64)
+        cur_bytes = flows['byte_count'].astype(np.float64)
+        first_sample = np.isnan(self._prev_ts[idxs])
+        
+        pps = np.empty(n)
+        bps = np.empty(n)
+        compute_rates(idxs, cur_pkts, cur_bytes, float(timestamp),
+                      self._prev_pkts, self._prev_bytes, self._prev_ts, pps, bps)
+        
+        # Lifetime averages from format_flows_for_ai (bps there is bytes/s)
+        pps[first_sample] = flows['pps'][first_sample]
+        bps[first_sample] = flows['bps'][first_sample] * 8.0
+        
+        return pps, bps
 
     # =========================================================================
     # AI INTEGRATION
     # =========================================================================
     
-    def _check_for_attack(self, flow_data: dict):
+    def _check_for_attacks(self, flows: np.ndarray, pps: np.ndarray, bps: np.ndarray):
         """
-        Run flow through Sentinel AI to detect attacks.
+        Run a switch's flows through Sentinel AI to detect attacks.
         
-        Called by: flow_stats_reply_handler for each flow
-        """
-        src_mac = flow_data['src_mac']
-        dst_mac = flow_data['dst_mac']
-        pps = flow_data['pps']
-        bps = flow_data['bps']
-        avg_pkt_size = flow_data['avg_pkt_size']
+        All flows that aren't already blocked go to the model in one
+        (N, 3) batch; only the flagged rows are handled individually.
         
-        # Skip if already blocked
-        if self._is_blocked(src_mac, dst_mac):
+        Called by: flow_stats_reply_handler once per reply
+        """
+        # Skip flows that are already blocked
+        if self.blocked_flows:
+            rows = np.flatnonzero(np.fromiter(
+                (not self._is_blocked(src, dst)
+                 for src, dst in zip(flows['src'].tolist(), flows['dst'].tolist())),
+                dtype=bool, count=len(flows)
+            ))
+        else:
+            rows = np.arange(len(flows))
+        if not len(rows):
             return
         
-        # Run prediction
-        prediction_result = self.sentinel.predict(pps, bps, avg_pkt_size)
+        X = np.column_stack([pps[rows], bps[rows], flows['avg_pkt_size'][rows]])
         
-        # Handle Dictionary vs Boolean return
-        is_attack = False
-        attack_type = "Unknown"
-        confidence = 0.0
-
-        if isinstance(prediction_result, dict):
-            is_attack = prediction_result.get('is_threat', False)
-            attack_type = prediction_result.get('attack_type', "DDoS")
-            confidence = prediction_result.get('confidence', 0.0)
-        else:
-            is_attack = bool(prediction_result)
+        # Run prediction
+        is_attack, attack_types = self.sentinel.predict_batch(X)
         
-        if is_attack:
-            # Add the type to flow_data so the handler can print it
-            flow_data['attack_type'] = attack_type 
-            self._handle_attack_detected(flow_data)
+        for row in np.flatnonzero(is_attack):
+            self._handle_attack_detected(flows[rows[row]], str(attack_types[row]))
     
-    def _handle_attack_detected(self, flow_data: dict):
+    def _handle_attack_detected(self, flow: np.void, attack_type: str = 'DDoS'):
         """
         Handle detected attack: block flow and send alert.
         
-        Called by: _check_for_attack when Sentinel detects anomaly
+        Called by: _check_for_attacks when Sentinel detects anomaly
         """
-        src_mac = flow_data['src_mac']
-        dst_mac = flow_data['dst_mac']
+        alert_key = (int(flow['src']), int(flow['dst']))
         
         # Check alert cooldown (avoid duplicate alerts)
-        alert_key = (src_mac, dst_mac)
         if alert_key in self.active_alerts:
             if time.time() < self.active_alerts[alert_key]:
                 return  # Still in cooldown
         
         # Set alert cooldown
-        self.active_alerts[alert_key] = time.time() + ALERT_COOLDOWN
+        expiry = time.time() + ALERT_COOLDOWN
+        self.active_alerts[alert_key] = expiry
+        heapq.heappush(self._alert_heap, (expiry, alert_key))
+        
+        src_mac = int_to_mac(alert_key[0])
+        dst_mac = int_to_mac(alert_key[1])
+        pps = round(float(flow['pps']), 3)  # float32 - round like flows_to_dicts
+        bps = round(float(flow['bps']), 3)
         
-        self.logger.error(f"[ATTACK] {flow_data.get('attack_type', 'DDoS')} detected: {src_mac} -> {dst_mac}")
-        self.logger.error(f"[ATTACK] Stats: PPS={flow_data['pps']:.2f}, BPS={flow_data['bps']:.2f}")
+        self.logger.error(f"[ATTACK] {attack_type} detected: {src_mac} -> {dst_mac}")
+        self.logger.error(f"[ATTACK] Stats: PPS={pps:.2f}, BPS={bps:.2f}")
         
         # Block the flow
         self._block_flow(src_mac, dst_mac, duration=60)
         
         # Send alert to backend
         alert = {
+            "timestamp": time.time(),
             "attacker_mac": src_mac,
             "target_mac": dst_mac,
-            "pps": flow_data['pps'],
-            "bps": flow_data['bps'],
+            "pps": pps,
+            "bps": bps,
             "action_taken": "BLOCKED",
             "block_duration_sec": 60
         }
-        self.backend.send_alert(alert)
+        self._alert_batch.append(alert)
+        if len(self._alert_batch) >= BACKEND_BATCH_SIZE:
+            self._flush_alerts()
     
     def _clean_expired_alerts(self):
-        """Remove expired alerts from tracking."""
+        """
+        Remove expired alerts from tracking.
+        
+        Pops only the heap entries that have expired; an entry whose key
+        has since been given a later expiry is stale and just dropped.
+        """
         now = time.time()
-        expired = [k for k, v in self.active_alerts.items() if v < now]
-        for k in expired:
-            del self.active_alerts[k]
+        heap = self._alert_heap
+        while heap and heap[0][0] < now:
+            expiry, key = heapq.heappop(heap)
+            if self.active_alerts.get(key) == expiry:
+                del self.active_alerts[key]
 
     # =========================================================================
     # BACKEND COMMUNICATION
@@ -606,46 +924,132 @@ class SentinetController(app_manager.RyuApp):
         self.backend.send_topology(TOPOLOGY)
         self.logger.info("[BACKEND] Topology sent")
     
-    def _send_stats_to_backend(self, dpid: int, flows: list):
-        """Send flow statistics to backend."""
-        stats = {
-            "dpid": dpid,
-            "flows": flows
-        }
-        self.backend.send_stats(stats)
+    def _send_stats_to_backend(self, dpid: int, flows: np.ndarray = None, extra: dict = None):
+        """
+        Queue a stats entry for the backend drain thread.
+        
+        An entry is a switch's flows, extra fields (e.g. an event name), or
+        both. Never blocks on backend I/O. Greenlets only switch at I/O or
+        sleep, so the ring needs no lock - not even when a full ring drops
+        its oldest entry by moving head.
+        """
+        ring = self._backend_ring
+        size = len(ring)
+        
+        next_tail = (self._ring_tail + 1) % size
+        if next_tail == self._ring_head:
+            self._ring_head = (self._ring_head + 1) % size  # Full - drop the oldest
+        
+        # Kept as arrays; converted to JSON-ready dicts by the drain thread
+        ring[self._ring_tail] = (dpid, flows, extra)
+        self._ring_tail = next_tail
+        
+        if (self._ring_tail - self._ring_head) % size >= BACKEND_BATCH_SIZE:
+            self._ring_ready.set()
+    
+    def _backend_drain(self):
+        """
+        Background thread: Send queued flow stats to backend.
+        
+        Wakes every BACKEND_BATCH_MAX_AGE seconds, or as soon as a full
+        batch is waiting, so backend round-trips never delay stats replies.
+        """
+        while True:
+            self._ring_ready.wait(timeout=BACKEND_BATCH_MAX_AGE)
+            self._ring_ready.clear()
+            self._drain_stats_ring()
+    
+    def _drain_stats_ring(self):
+        """Send everything in the stats ring, at most BACKEND_BATCH_SIZE entries per request."""
+        ring = self._backend_ring
+        size = len(ring)
+        
+        while self._ring_head != self._ring_tail:
+            batch = []
+            head = self._ring_head
+            while head != self._ring_tail and len(batch) < BACKEND_BATCH_SIZE:
+                batch.append(ring[head])
+                ring[head] = None
+                head = (head + 1) % size
+            self._ring_head = head
+            
+            self.backend.send_stats_batch([self._stats_entry(*item) for item in batch])
+            hub.sleep(0)  # Let packet-ins and replies run between batches
+    
+    @staticmethod
+    def _stats_entry(dpid: int, flows: np.ndarray, extra: dict) -> dict:
+        """Build the JSON-ready dict for one ring entry."""
+        entry = {"dpid": dpid}
+        if flows is not None:
+            entry["flows"] = flows_to_dicts(flows)
+        if extra:
+            entry.update(extra)
+        return entry
+    
+    def _send_switch_event(self, event_type: str, dpid: int):
+        """
+        Queue a switch connect/disconnect event with the batched stats.
+        
+        Every event is kept, in order, so a flapping switch reports each
+        transition.
+        """
+        self._send_stats_to_backend(dpid, extra={"event": "switch_" + event_type, "ts": time.time()})
+        self.logger.info(f"[BACKEND] Switch event queued: {event_type} dpid={dpid}")
+    
+    def _flush_alerts(self):
+        """
+        Send all queued alerts to backend in a single request.
+        
+        Called by: _monitor_loop every tick, or early when the batch fills up.
+        """
+        if self._alert_batch:
+            batch, self._alert_batch = self._alert_batch, []
+            self.backend.send_alerts_batch(batch)
 
     # =========================================================================
     # CSV LOGGING (for training data)
     # =========================================================================
     
-    def _log_to_csv(self, flows: list):
-        """Log flow statistics to CSV file."""
-        file_exists = os.path.isfile(CSV_FILE_PATH)
+    def _log_to_csv(self, flows: np.ndarray):
+        """
+        Log flow statistics to CSV file.
         
-        with open(CSV_FILE_PATH, "a") as f:
-            if not file_exists:
-                f.write("timestamp,dpid,src,dst,packet_count,byte_count,"
-                       "duration_sec,pps,bps,avg_pkt_size\n")
-            
-            for flow in flows:
-                f.write(f"{flow['timestamp']},{flow['dpid']},{flow['src_mac']},"
-                       f"{flow['dst_mac']},{flow['packet_count']},{flow['byte_count']},"
-                       f"{flow['duration_sec']:.4f},{flow['pps']:.2f},"
-                       f"{flow['bps']:.2f},{flow['avg_pkt_size']:.2f}\n")
+        Rows are formatted up front and handed to the open file in one
+        writelines call; the monitor loop flushes the buffer every
+        CSV_FLUSH_INTERVAL seconds and close() flushes what is left.
+        """
+        lines = [
+            f"{ts},{dpid},{int_to_mac(src)},{int_to_mac(dst)},{packets},{octets},"
+            f"{duration:.4f},{pps:.2f},{bps:.2f},{avg_pkt_size:.2f}\n"
+            for (ts, dpid, src, dst, _in_port, _out_port, packets, octets,
+                 duration, pps, bps, avg_pkt_size) in flows.tolist()
+        ]
+        self._csv_fp.writelines(lines)
+    
+    def close(self):
+        """Flush and close the CSV log when Ryu shuts the app down."""
+        if self._csv_fp:
+            self._csv_fp.close()
+            self._csv_fp = None
+        super(SentinetController, self).close()
 
     # =========================================================================
     # CONSOLE OUTPUT
     # =========================================================================
     
-    def _print_stats(self, dpid: int, flows: list):
+    def _print_stats(self, dpid: int, flows: np.ndarray):
         """Print flow statistics to console."""
         print(f"\n--- Stats for Switch s{dpid} ---")
-        sorted_flows = sorted(flows, key=lambda f: f['pps'], reverse=True)
-        
-        for flow in sorted_flows[:5]:  # Top 5 flows
-            status = "🔴 BLOCKED" if self._is_blocked(flow['src_mac'], flow['dst_mac']) else ""
-            print(f"  {flow['src_mac']} -> {flow['dst_mac']} | "
-                  f"PPS: {flow['pps']:.1f} | BPS: {flow['bps']:.1f} {status}")
+        # Top 5 flows: partial selection, then order just those rows
+        if len(flows) > 5:
+            flows = flows[np.argpartition(flows['pps'], -5)[-5:]]
+        top_flows = flows[np.argsort(flows['pps'])[::-1]]
+        
+        for src, dst, pps, bps in zip(top_flows['src'].tolist(), top_flows['dst'].tolist(),
+                                      top_flows['pps'].tolist(), top_flows['bps'].tolist()):
+            status = "🔴 BLOCKED" if self._is_blocked(src, dst) else ""
+            print(f"  {int_to_mac(src)} -> {int_to_mac(dst)} | "
+                  f"PPS: {pps:.1f} | BPS: {bps:.1f} {status}")
 
     # =========================================================================
     # PUBLIC API - For AI Models to Call
@@ -661,7 +1065,13 @@ class SentinetController(app_manager.RyuApp):
             - link_stats: {(from, to): total_bps}
         
         The Navigator AI uses this to find optimal paths considering congestion.
+        The graph only changes when a stats reply updates link usage, so it is
+        cached until then; callers must treat it as read-only.
         """
+        version, graph = self._graph_cache
+        if version == self._link_usage_version:
+            return graph
+        
         graph = prepare_navigator_input(self.mac_to_port, TOPOLOGY)
         
         # Calculate link utilization from flow stats
@@ -686,46 +1096,61 @@ class SentinetController(app_manager.RyuApp):
                     neighbor['congestion'] = 0
         
         graph['_link_stats'] = link_stats
+        self._graph_cache = (self._link_usage_version, graph)
         return graph
     
-    def _calculate_link_utilization(self) -> dict:
+    def _update_link_usage(self, dpid: int, flows: np.ndarray, bps: np.ndarray):
         """
-        Calculate total bandwidth usage per link based on flow statistics.
+        Replace a switch's contribution to the per-link bandwidth totals.
         
-        Returns:
-            Dictionary: {(from_switch, to_switch): total_bps}
+        Called by: flow_stats_reply_handler with the switch's fresh flows
         
         Logic:
-        - For each flow on each switch, determine which link it uses
-        - Sum up BPS for flows traversing each link
+        - Map each flow's out_port to the link it uses
+        - Subtract the switch's previous contribution, add the new one
         """
-        link_usage = {}
-        
-        # Build switch port map if not exists
-        if not hasattr(self, '_switch_ports'):
-            self._build_switch_port_map()
-        
-        # Build reverse map: port -> neighbor_switch
-        port_to_neighbor = {}
-        for (from_sw, to_sw), port in self._switch_ports.items():
-            dpid = int(from_sw[1:])  # "s1" -> 1
-            port_to_neighbor[(dpid, port)] = to_sw
+        n_links = len(self._link_keys)
+        links = [self._port_to_link.get((dpid, port), -1) for port in flows['out_port'].tolist()]
+        links = np.asarray(links, dtype=np.intp)
+        on_link = links >= 0
+        
+        usage = np.zeros(n_links)
+        np.add.at(usage, links[on_link], bps[on_link])
+        flow_count = np.bincount(links[on_link], minlength=n_links)
+        
+        previous = self._switch_link_usage.get(dpid)
+        if previous is not None:
+            self._link_usage -= previous[0]
+            self._link_flow_count -= previous[1]
+        self._link_usage += usage
+        self._link_flow_count += flow_count
+        self._switch_link_usage[dpid] = (usage, flow_count)
+        
+        # Guard against float drift from repeated add/subtract
+        np.clip(self._link_usage, 0.0, None, out=self._link_usage)
+        self._link_usage_version += 1
+        
+        # Navigator weighs paths by link load - recompute them once it has shifted
+        if self._path_port_cache:
+            shift = np.abs(self._link_usage - self._routed_link_usage).max(initial=0.0)
+            if shift > PATH_CACHE_REROUTE_BPS:
+                self._path_port_cache.clear()
+    
+    def _calculate_link_utilization(self) -> dict:
+        """
+        Get total bandwidth usage per link based on flow statistics.
         
-        # Analyze flows on each switch
-        for dpid, flows in self.flow_stats.items():
-            switch_id = f"s{dpid}"
-            
-            for flow in flows:
-                out_port = flow.get('out_port', 0)
-                bps = flow.get('bps', 0)
-                
-                # Determine which link this flow uses
-                neighbor = port_to_neighbor.get((dpid, out_port))
-                if neighbor:
-                    link_key = (switch_id, neighbor)
-                    link_usage[link_key] = link_usage.get(link_key, 0) + bps
+        Returns:
+            Dictionary: {(from_switch, to_switch): total_bps}
+            Only links currently carrying at least one flow are included.
         
-        return link_usage
+        The totals are maintained incrementally by _update_link_usage as
+        each switch reports, so this is O(links) rather than O(all flows).
+        """
+        return {
+            self._link_keys[idx]: float(self._link_usage[idx])
+            for idx in np.flatnonzero(self._link_flow_count)
+        }
     
     def get_link_stats(self) -> list:
         """
@@ -770,12 +1195,11 @@ class SentinetController(app_manager.RyuApp):
         """
         all_flows = []
         for dpid, flows in self.flow_stats.items():
-            for flow in flows:
-                if src_mac and flow['src_mac'] != src_mac:
-                    continue
-                if dst_mac and flow['dst_mac'] != dst_mac:
-                    continue
-                all_flows.append(flow)
+            if src_mac:
+                flows = flows[flows['src'] == mac_to_int(src_mac)]
+            if dst_mac:
+                flows = flows[flows['dst'] == mac_to_int(dst_mac)]
+            all_flows.extend(flows_to_dicts(flows))
         
         return all_flows
     
@@ -786,16 +1210,13 @@ class SentinetController(app_manager.RyuApp):
         Returns:
             Host dict from topology or None
         """
-        for host in TOPOLOGY['hosts']:
-            if host['mac'] == mac:
-                return host
-        return None
+        return self._host_by_mac.get(mac)
     
     def get_active_alerts(self) -> list:
         """Get list of currently active security alerts."""
         now = time.time()
         return [
-            {"src": k[0], "dst": k[1], "expires_in": v - now}
+            {"src": int_to_mac(k[0]), "dst": int_to_mac(k[1]), "expires_in": v - now}
             for k, v in self.active_alerts.items()
             if v > now
         ]
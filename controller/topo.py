@@ -1,9 +1,220 @@
+import os
+
 from mininet.topo import Topo
 from mininet.net import Mininet
-from mininet.node import RemoteController, OVSKernelSwitch
-from mininet.link import TCLink
+from mininet.node import RemoteController, OVSKernelSwitch, Host
+from mininet.link import Link, TCLink, TCIntf
 from mininet.cli import CLI
 from mininet.log import setLogLevel
+from mininet.util import quietRun, errRun
+
+from config import TOPOLOGY
+
+# SENTINET_FAST_START configures all switches with one batched ovs-vsctl
+# call and bounds the wait for them to connect to the controller
+FAST_START = bool(os.environ.get('SENTINET_FAST_START'))
+FAST_START_TIMEOUT = 5  # seconds
+
+# Options shared by every switch
+_SWITCH_OPTS = dict(cls=OVSKernelSwitch, protocols='OpenFlow13', batch=FAST_START)
+
+# Unattended runs (no CLI) can set SENTINET_HEADLESS to use HeadlessHost
+HEADLESS = bool(os.environ.get('SENTINET_HEADLESS'))
+
+# SENTINET_STATIC_ARP pre-fills every host's ARP table, so first contact
+# between hosts doesn't send ARP requests through the controller
+STATIC_ARP = bool(os.environ.get('SENTINET_STATIC_ARP'))
+
+# SENTINET_TUNE_DATAPATH raises the OVS datapath flow timeouts below for
+# the run; the previous values are put back when the network stops
+TUNE_DATAPATH = bool(os.environ.get('SENTINET_TUNE_DATAPATH'))
+
+# Datapath flow timeouts (ms) set by tune_datapath - OVS defaults are 10000 / 500
+FLOW_MAX_IDLE_MS = 60000
+MAX_REVALIDATOR_MS = 10000
+_DATAPATH_CONFIG = {'max-idle': FLOW_MAX_IDLE_MS, 'max-revalidator': MAX_REVALIDATOR_MS}
+
+# FastLink drops delays up to this long (ms) - not worth a netem qdisc
+FAST_LINK_MAX_DELAY_MS = 1.0
+
+
+def _delay_ms(delay) -> float:
+    """Parse a tc delay string such as '0.5ms' into milliseconds."""
+    value = str(delay).strip()
+    for unit, scale in (('us', 0.001), ('ms', 1.0), ('s', 1000.0)):
+        if value.endswith(unit):
+            value = value[:-len(unit)]
+            break
+    else:
+        scale = 1.0
+    try:
+        return float(value) * scale
+    except ValueError:
+        return float('inf')  # Unknown format - keep the delay
+
+
+class FastIntf(TCIntf):
+    """
+    TCIntf that skips the netem qdisc for negligible delays.
+    
+    Bandwidth is still shaped with htb; only delays of at most
+    FAST_LINK_MAX_DELAY_MS are dropped, saving a qdisc hop per packet.
+    """
+    def config(self, delay=None, **params):
+        if delay is not None and _delay_ms(delay) <= FAST_LINK_MAX_DELAY_MS:
+            delay = None
+        return super(FastIntf, self).config(delay=delay, **params)
+
+
+class FastLink(TCLink):
+    """TCLink whose interfaces are FastIntf (bandwidth-only when delay <= 1ms)."""
+    intf_cls = FastIntf
+    
+    def __init__(self, node1, node2, port1=None, port2=None,
+                 intfName1=None, intfName2=None,
+                 addr1=None, addr2=None, **params):
+        # Same wiring as TCLink, with intf_cls on both ends
+        Link.__init__(self, node1, node2, port1=port1, port2=port2,
+                      intfName1=intfName1, intfName2=intfName2,
+                      cls1=self.intf_cls, cls2=self.intf_cls,
+                      addr1=addr1, addr2=addr2,
+                      params1=params, params2=params)
+
+class HeadlessHost(Host):
+    """
+    Host whose namespace shell is /bin/sh instead of an interactive bash.
+    
+    Mininet still drives every host through a shell (addresses, routes,
+    test commands), so the shell can't be dropped - but sh is far lighter
+    than bash. Only used when SENTINET_HEADLESS is set.
+    """
+    def _popen(self, cmd, **params):
+        # Only rewrite the namespace shell started by startShell()
+        if cmd and cmd[-1] == 'mininet:' + self.name and 'bash' in cmd:
+            cmd = [('sh' if arg == 'bash' else arg) for arg in cmd
+                   if arg not in ('--norc', '--noediting')]
+        return super(HeadlessHost, self)._popen(cmd, **params)
+
+
+def host_class():
+    """Host class for Mininet(): HeadlessHost for unattended runs, else Host."""
+    return HeadlessHost if HEADLESS else Host
+
+
+def disable_ipv6(net):
+    """
+    Turn IPv6 off on every host and on the switch ports.
+    
+    Otherwise each interface sends neighbour discovery / MLD packets that
+    all end up as packet-ins at the controller. Switches share the root
+    namespace, so only their own ports are touched there.
+    """
+    for host in net.hosts:
+        host.cmd('sysctl -qw net.ipv6.conf.all.disable_ipv6=1 net.ipv6.conf.default.disable_ipv6=1')
+    for switch in net.switches:
+        ports = [f'net.ipv6.conf.{intf}.disable_ipv6=1'
+                 for intf in switch.intfNames() if intf != 'lo']
+        if ports:
+            switch.cmd('sysctl -qw ' + ' '.join(ports))
+
+
+def tune_datapath():
+    """
+    Keep idle datapath flows longer.
+    
+    Busy flows on the gigabit links are then not evicted and re-upcalled
+    between bursts. max-idle/max-revalidator live in the Open_vSwitch
+    table, so one call covers every switch of the daemon - which is why
+    the previous values are returned (None when unset) for restore_datapath.
+    """
+    previous = {}
+    for key in _DATAPATH_CONFIG:
+        out, _, code = errRun(f'ovs-vsctl --if-exists get Open_vSwitch . other_config:{key}')
+        previous[key] = out.strip().strip('"') if code == 0 and out.strip() else None
+    quietRun('ovs-vsctl set Open_vSwitch . ' +
+             ' '.join(f'other_config:{key}={value}' for key, value in _DATAPATH_CONFIG.items()))
+    return previous
+
+
+def restore_datapath(previous):
+    """Put back the other_config values saved by tune_datapath."""
+    cmds = [f'-- set Open_vSwitch . other_config:{key}={value}' if value is not None
+            else f'-- remove Open_vSwitch . other_config {key}'
+            for key, value in previous.items()]
+    quietRun('ovs-vsctl ' + ' '.join(cmds))
+
+
+def start_network(net):
+    """
+    Start the network; with FAST_START, wait (bounded) for the switches to connect.
+    
+    Returns the datapath settings to hand back to stop_network.
+    """
+    # Mininet() has already built the network: turn IPv6 off before the
+    # switches are started and reach the controller
+    disable_ipv6(net)
+    saved = tune_datapath() if TUNE_DATAPATH else None
+    if STATIC_ARP:
+        net.staticArp()  # arp -s for every other host, on every host
+    net.start()
+    if FAST_START:
+        net.waitConnected(timeout=FAST_START_TIMEOUT)
+    return saved
+
+
+def stop_network(net, saved=None):
+    """Stop the network and restore any datapath settings start_network changed."""
+    net.stop()
+    if saved is not None:
+        restore_datapath(saved)
+
+
+# =============================================================================
+# TOPOLOGY DEFINITION
+# =============================================================================
+# Built from config.TOPOLOGY, which the controller also uses to work out
+# port numbers - only the host link shaping lives here. Links are added in
+# list order, which decides port numbers: host links first (in host order),
+# then the backbone, the same order _build_switch_port_map counts them in.
+
+# Host links: 100 Mbps, 0.5ms unless listed in _HOST_LINK_SHAPING
+_HOST_LINK_DEFAULT = {"bw_mbps": 100, "delay_ms": 0.5}
+_HOST_LINK_SHAPING = {
+    "h6": {"bw_mbps": 1000, "delay_ms": 0.1},  # Gigabit server
+    "h7": {"bw_mbps": 1000, "delay_ms": 0.1},  # Gigabit server
+}
+
+SENTINET_TOPOLOGY = {
+    "switches": TOPOLOGY["switches"],
+    "hosts": TOPOLOGY["hosts"],
+    "links": [
+        {"from": host["id"], "to": host["switch"],
+         **_HOST_LINK_SHAPING.get(host["id"], _HOST_LINK_DEFAULT)}
+        for host in TOPOLOGY["hosts"]
+    ] + TOPOLOGY["links"],
+}
+
+
+def build_from_spec(topo, spec, link_opts=None):
+    """
+    Add the switches, hosts and links of a topology spec to a Topo.
+    
+    Links are added in list order, so the spec alone decides port numbers.
+    link_opts optionally maps (from, to) to extra addLink options.
+    """
+    link_opts = link_opts or {}
+    
+    for switch in spec['switches']:
+        topo.addSwitch(switch['id'], **_SWITCH_OPTS)
+    
+    for host in spec['hosts']:
+        topo.addHost(host['id'], mac=host['mac'], ip=f"{host['ip']}/24")
+    
+    for link in spec['links']:
+        topo.addLink(link['from'], link['to'],
+                     bw=link['bw_mbps'], delay=f"{link['delay_ms']}ms",
+                     **link_opts.get((link['from'], link['to']), {}))
+
 
 class SentinetTopo(Topo):
     """
@@ -27,71 +238,12 @@ class SentinetTopo(Topo):
     
     This provides varied path lengths for Q-Learning without loops.
     
-    ⚠️  CRITICAL SYNCHRONIZATION WARNING ⚠️
-    ========================================
-    The order of hosts and links here MUST EXACTLY MATCH the TOPOLOGY 
-    constant in config.py. The Controller uses config.py to calculate 
-    port numbers. If you add/remove/reorder ANY links or hosts here:
-    
-    1. Update TOPOLOGY['hosts'] in config.py to match host order
-    2. Update TOPOLOGY['links'] in config.py to match link order
-    
-    Failure to sync will cause packets to route to WRONG PORTS!
+    Switches, hosts and backbone links come from TOPOLOGY in config.py -
+    the same data the Controller uses to calculate port numbers - so add,
+    remove or reorder them there, not here.
     """
     def build(self):
-        # ============================================
-        # 1. Create Switches (5 switches - tree structure)
-        # ============================================
-        s1 = self.addSwitch('s1', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Core
-        s2 = self.addSwitch('s2', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Distribution
-        s3 = self.addSwitch('s3', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Access (Left)
-        s4 = self.addSwitch('s4', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Access (Center)
-        s5 = self.addSwitch('s5', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Access (Right)
-
-        # ============================================
-        # 2. Create Hosts (8 hosts across the network)
-        # ============================================
-        # Left Branch (via s3) - User workstations
-        h1 = self.addHost('h1', mac="00:00:00:00:00:01", ip="10.0.0.1/24")
-        h2 = self.addHost('h2', mac="00:00:00:00:00:02", ip="10.0.0.2/24")
-        h3 = self.addHost('h3', mac="00:00:00:00:00:03", ip="10.0.0.3/24")  # Attacker
-        
-        # Center Branch (via s2, s4) - Department servers
-        h4 = self.addHost('h4', mac="00:00:00:00:00:04", ip="10.0.0.4/24")
-        h5 = self.addHost('h5', mac="00:00:00:00:00:05", ip="10.0.0.5/24")
-        
-        # Right Branch (via s5) - Data center
-        h6 = self.addHost('h6', mac="00:00:00:00:00:06", ip="10.0.0.6/24")
-        h7 = self.addHost('h7', mac="00:00:00:00:00:07", ip="10.0.0.7/24")
-        h8 = self.addHost('h8', mac="00:00:00:00:00:08", ip="10.0.0.8/24")
-
-        # ============================================
-        # 3. Create Links - BACKBONE (Switch to Switch)
-        # ============================================
-        # Core to Distribution/Access (High bandwidth backbone)
-        self.addLink(s1, s2, bw=100, delay='1ms')   # Core ↔ Distribution
-        self.addLink(s1, s4, bw=50,  delay='2ms')   # Core ↔ Access Center
-        self.addLink(s1, s5, bw=100, delay='1ms')   # Core ↔ Access Right
-        
-        # Distribution to Access (Lower tier)
-        self.addLink(s2, s3, bw=50,  delay='3ms')   # Distribution ↔ Access Left
-
-        # ============================================
-        # 4. Create Links - HOST CONNECTIONS
-        # ============================================
-        # Left branch hosts (s3)
-        self.addLink(h1, s3, bw=100, delay='0.5ms')
-        self.addLink(h2, s3, bw=100, delay='0.5ms')
-        self.addLink(h3, s3, bw=100, delay='0.5ms')  # Attacker on edge
-        
-        # Center hosts (s2, s4)
-        self.addLink(h4, s2, bw=100, delay='0.5ms')  # Directly on distribution
-        self.addLink(h5, s4, bw=100, delay='0.5ms')
-        
-        # Right branch hosts (s5) - "Data Center"
-        self.addLink(h6, s5, bw=1000, delay='0.1ms')  # Gigabit server
-        self.addLink(h7, s5, bw=1000, delay='0.1ms')  # Gigabit server
-        self.addLink(h8, s5, bw=100,  delay='0.5ms')  # Regular host
+        build_from_spec(self, SENTINET_TOPOLOGY)
 
 def run():
     setLogLevel('info')
@@ -100,13 +252,15 @@ def run():
     # We use RemoteController because Ryu is running externally
     net = Mininet(topo=topo, 
                   controller=RemoteController, 
-                  link=TCLink,
-                  autoSetMacs=True)
+                  link=FastLink,
+                  host=host_class())
     
-    net.start()
+    saved = start_network(net)
     print("*** Network is UP. Running CLI...")
-    CLI(net) # Opens the Mininet command prompt
-    net.stop()
+    try:
+        CLI(net) # Opens the Mininet command prompt
+    finally:
+        stop_network(net, saved)
 
 if __name__ == '__main__':
     run()
\ No newline at end of file
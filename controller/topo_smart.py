@@ -27,11 +27,58 @@ Usage:
 
 from mininet.topo import Topo
 from mininet.net import Mininet
-from mininet.node import RemoteController, OVSKernelSwitch
-from mininet.link import TCLink
+from mininet.node import RemoteController
+from mininet.link import Intf
 from mininet.cli import CLI
 from mininet.log import setLogLevel
 
+from topo import build_from_spec, host_class, start_network, stop_network, FastIntf, FastLink
+
+# TCIntf options that change the qdisc layout - these always rebuild it
+_REBUILD_OPTS = ('use_hfsc', 'use_tbf', 'latency_ms', 'enable_ecn', 'enable_red',
+                 'max_queue_size', 'speedup')
+
+
+class SmoothTCIntf(FastIntf):
+    """
+    Interface whose shaping can be changed live without a gap.
+    
+    TCIntf.config deletes the root qdisc and adds it again, so re-shaping a
+    running link (e.g. congesting Path B from the CLI) leaves it unshaped
+    for a moment. When htb and netem are already installed, this changes
+    their parameters in place with 'tc ... change' instead.
+    """
+    def config(self, bw=None, delay=None, jitter=None, loss=None, **params):
+        tcoutput = self.tc('%s qdisc show dev %s')
+        shaped = 'qdisc htb 5:' in tcoutput and 'qdisc netem 10:' in tcoutput
+        if (not shaped or bw is None or not (delay or jitter or loss)
+                or any(params.get(opt) for opt in _REBUILD_OPTS)):
+            return super(SmoothTCIntf, self).config(bw=bw, delay=delay, jitter=jitter,
+                                                    loss=loss, **params)
+        
+        result = Intf.config(self, **params)
+        netem_args = '%s%s%s' % ('delay %s ' % delay if delay else '',
+                                 '%s ' % jitter if jitter else '',
+                                 'loss %.5f ' % loss if loss else '')
+        cmds = ['%s class change dev %s parent 5:0 classid 5:1 htb ' +
+                'rate %fMbit burst 15k' % bw,
+                '%s qdisc change dev %s parent 5:1 handle 10: netem ' + netem_args]
+        result['tcoutputs'] = [self.tc(cmd) for cmd in cmds]
+        return result
+
+
+class SmoothTCLink(FastLink):
+    """FastLink whose interfaces are SmoothTCIntf (in-place tc changes)."""
+    intf_cls = SmoothTCIntf
+
+
+# Path B links are the ones re-shaped during congestion experiments
+_PATH_B_OPTS = {
+    ('s1', 's2'): {'cls': SmoothTCLink},
+    ('s2', 's3'): {'cls': SmoothTCLink},
+    ('s3', 's4'): {'cls': SmoothTCLink},
+}
+
 
 class DiamondTopo(Topo):
     """
@@ -56,39 +103,8 @@ class DiamondTopo(Topo):
     """
     
     def build(self):
-        # ============================================
-        # 1. Create Switches (Diamond Structure)
-        # ============================================
-        s1 = self.addSwitch('s1', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Entry point
-        s2 = self.addSwitch('s2', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Slow path hop 1
-        s3 = self.addSwitch('s3', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Slow path hop 2  
-        s4 = self.addSwitch('s4', cls=OVSKernelSwitch, protocols='OpenFlow13')  # Exit point
-        
-        # ============================================
-        # 2. Create Hosts
-        # ============================================
-        h1 = self.addHost('h1', mac="00:00:00:00:00:01", ip="10.0.0.1/24")  # Source host
-        h2 = self.addHost('h2', mac="00:00:00:00:00:02", ip="10.0.0.2/24")  # Destination host
-        
-        # ============================================
-        # 3. Connect Hosts to Edge Switches
-        # ============================================
-        self.addLink(h1, s1, bw=100, delay='0.5ms')  # h1 connected to entry
-        self.addLink(h2, s4, bw=100, delay='0.5ms')  # h2 connected to exit
-        
-        # ============================================
-        # 4. PATH A: The Fast Path (Direct)
-        # ============================================
-        # High bandwidth, low latency - the "ideal" route
-        self.addLink(s1, s4, bw=100, delay='1ms')  # 100 Mbps, 1ms
-        
-        # ============================================
-        # 5. PATH B: The Slow Path (Multi-hop)
-        # ============================================
-        # Low bandwidth, high latency - the "backup" route
-        self.addLink(s1, s2, bw=10, delay='10ms')  # 10 Mbps, 10ms (congested simulation)
-        self.addLink(s2, s3, bw=10, delay='10ms')  # 10 Mbps, 10ms
-        self.addLink(s3, s4, bw=10, delay='10ms')  # 10 Mbps, 10ms
+        # Switches, hosts, host links, then Path A and Path B (see DIAMOND_TOPOLOGY)
+        build_from_spec(self, DIAMOND_TOPOLOGY, link_opts=_PATH_B_OPTS)
 
 
 # =============================================================================
@@ -153,17 +169,19 @@ def run():
     net = Mininet(
         topo=topo,
         controller=RemoteController,
-        link=TCLink,
-        autoSetMacs=True
+        link=FastLink,
+        host=host_class()
     )
     
-    net.start()
+    saved = start_network(net)
     print("*** Network is UP. Ryu controller should be running on port 6653.")
     print("*** Use 'pingall' to verify connectivity.")
     print("*** Type 'exit' or Ctrl+D to stop.\n")
     
-    CLI(net)
-    net.stop()
+    try:
+        CLI(net)
+    finally:
+        stop_network(net, saved)
 
 
 if __name__ == '__main__':
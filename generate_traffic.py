@@ -1,80 +1,209 @@
 
-import pandas as pd
 import numpy as np
 import time
 import os
-import random
 
-def generate_normal_traffic(num_samples=1000, output_file='controller/traffic_data.csv'):
+# Try to import pyarrow (native CSV/Parquet writers); CSV falls back to pandas.
+# pandas is imported only on that fallback path - it is slow to load.
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pcsv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Try to import Numba (optional - compiled row loop for the numeric features)
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Value pools for the generated columns (built once, shared by every call)
+# Switches: s1, s2, s3, s4
+_SWITCHES = np.array([1, 2, 3, 4], dtype=np.int32)
+
+# MAC Addresses (Dummy)
+# Fixed-width strings, so indexing a column is a plain memory copy
+_MACS = np.fromiter((f"00:00:00:00:00:0{i}" for i in range(1, 9)), dtype='U17')
+
+# Packet sizes and how often each one is picked
+_PKT_SIZES = np.array([64, 128, 512, 1024, 1500], dtype=np.int32)
+_PKT_PROBS = np.array([0.3, 0.2, 0.2, 0.2, 0.1])
+_PKT_CDF = np.cumsum(_PKT_PROBS)
+
+
+def _traffic_features_numpy(n, seed):
+    """Draw the numeric feature columns for n rows as whole-array operations."""
+    rng = np.random.default_rng(seed)
+
+    # Generate NORMAL traffic features
+    # PPS: 1 - 5 (Quieter baseline to fix "Goldilocks" problem)
+    # integers(low, high) is exclusive at the top -> 1, 2, 3, 4, 5
+    pps = rng.integers(1, 6, size=n, dtype=np.int32)
+
+    # Avg Packet Size: 64 - 1500 bytes (Normal distribution centered around common sizes)
+    # Using a simple choice for readability and realism
+    avg_pkt_size = rng.choice(_PKT_SIZES, size=n, p=_PKT_PROBS)
+
+    # BPS: Derived from PPS * Avg Size * 8 (bits) roughly, plus some variation
+    # The +/-10% variation is just noise, so it comes from Knuth's multiplicative
+    # hash of the row index (top 16 bits, mod 2^32) instead of the RNG. The
+    # index is offset by the seed so appended batches don't repeat the sequence
+    offset = np.uint32(int(seed) & 0xFFFFFFFF)
+    hashed = ((np.arange(n, dtype=np.uint32) + offset) * np.uint32(2654435761)) >> 16
+    jitter = 0.9 + 0.2 * hashed.astype(np.float32) / 65535.0
+    bps = (pps * avg_pkt_size * 8 * jitter).astype(np.float32)
+
+    # Duration: Short flows
+    duration = rng.uniform(1, 60, size=n).astype(np.float32)
+
+    # Counts
+    packet_count = (pps * duration).astype(np.int32)
+    byte_count = (bps * duration / 8).astype(np.int32)
+
+    return pps, avg_pkt_size, bps, duration, packet_count, byte_count
+
+
+def _traffic_features_loop(n, seed):
+    """
+    Same as _traffic_features_numpy, one row at a time.
+    
+    This is the version compiled by Numba; prange spreads the rows over
+    threads. Each thread draws from its own random stream, so the seed
+    does not make parallel runs repeatable.
+    """
+    np.random.seed(seed)
+    offset = int(seed) & 0xFFFFFFFF
+    pps = np.empty(n, dtype=np.int32)
+    avg_pkt_size = np.empty(n, dtype=np.int32)
+    bps = np.empty(n, dtype=np.float32)
+    duration = np.empty(n, dtype=np.float32)
+    packet_count = np.empty(n, dtype=np.int32)
+    byte_count = np.empty(n, dtype=np.int32)
+
+    for i in prange(n):
+        pps[i] = np.random.randint(1, 6)
+
+        # Inverse-CDF pick of the packet size
+        u = np.random.random()
+        k = 0
+        while k < _PKT_CDF.shape[0] - 1 and u >= _PKT_CDF[k]:
+            k += 1
+        avg_pkt_size[i] = _PKT_SIZES[k]
+
+        hashed = ((((i + offset) & 0xFFFFFFFF) * 2654435761) & 0xFFFFFFFF) >> 16
+        bps[i] = pps[i] * avg_pkt_size[i] * 8 * (0.9 + 0.2 * hashed / 65535.0)
+        duration[i] = np.random.uniform(1, 60)
+        packet_count[i] = int(pps[i] * duration[i])
+        byte_count[i] = int(bps[i] * duration[i] / 8)
+
+    return pps, avg_pkt_size, bps, duration, packet_count, byte_count
+
+
+if NUMBA_AVAILABLE:
+    # Only used when asked for (use_numba=True); fastmath is safe, every value is finite
+    _traffic_features_jit = njit(cache=True, parallel=True, fastmath=True)(_traffic_features_loop)
+
+
+def generate_normal_traffic(num_samples=1000, output_file='controller/traffic_data.csv', preview=False,
+                            append=False, output_format='csv', use_numba=False):
     """
     Generates synthetic 'Normal' traffic data for training the anomaly detection model.
+    If preview is set, summary statistics of the feature columns are printed.
+    If append is set, the new rows are added to an existing file instead of replacing it.
+    output_format is 'csv', 'parquet' or 'both'; Parquet goes next to output_file
+    with a .parquet extension (zstd-compressed, typed columns).
+    use_numba draws the numeric features with the compiled row loop instead
+    of NumPy (needs Numba; different random streams, not reproducible).
     """
+    if output_format not in ('csv', 'parquet', 'both'):
+        raise ValueError(f"Unknown output_format: {output_format}")
+    if append and output_format != 'csv':
+        raise ValueError("append is only supported for CSV output")
+    if output_format != 'csv' and not PYARROW_AVAILABLE:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+    if use_numba and not NUMBA_AVAILABLE:
+        raise ImportError("use_numba requires numba (pip install numba)")
+    
     print(f"[INFO] Generating {num_samples} samples of synthetic traffic data...")
 
     # Timestamps: generate a sequence
     start_time = time.time()
-    timestamps = [start_time + i for i in range(num_samples)]
+    timestamps = start_time + np.arange(num_samples, dtype=np.float64)
 
-    # Switches: s1, s2, s3, s4
-    switches = [1, 2, 3, 4]
+    n = num_samples
+    rng = np.random.default_rng()
 
-    # MAC Addresses (Dummy)
-    macs = [f"00:00:00:00:00:0{i}" for i in range(1, 9)]
+    # Every column is drawn for all samples at once. Features are 32-bit:
+    # plenty for training data, and the CSV gets shorter number strings.
+    # Timestamps stay float64 - epoch seconds need the precision.
+    dpid = rng.choice(_SWITCHES, size=n)
 
-    data = []
+    # Source and destination hosts must differ: offsetting by 1..7 (mod 8)
+    # picks one of the other hosts uniformly, without redrawing
+    src_idx = rng.integers(0, len(_MACS), size=n, dtype=np.int8)
+    dst_idx = (src_idx + rng.integers(1, len(_MACS), size=n, dtype=np.int8)) % len(_MACS)
 
-    for ts in timestamps:
-        dpid = random.choice(switches)
-        src = random.choice(macs)
-        dst = random.choice(macs)
-        while dst == src:
-            dst = random.choice(macs)
+    # Numeric features: array operations, or the compiled row loop on request
+    features = _traffic_features_jit if use_numba else _traffic_features_numpy
+    pps, avg_pkt_size, bps, duration, packet_count, byte_count = \
+        features(n, rng.integers(2**31))
 
-        # Generate NORMAL traffic features
-        # PPS: 1 - 5 (Quieter baseline to fix "Goldilocks" problem)
-        pps = np.random.randint(1, 6)  # randint is exclusive at the top for numpy? No, python random is inclusive, numpy is exclusive. 
-        # Using numpy.random.randint(low, high) -> [low, high)
-        # So randint(1, 6) gives 1, 2, 3, 4, 5
-        
-        # Avg Packet Size: 64 - 1500 bytes (Normal distribution centered around common sizes)
-        # Using a simple choice for readability and realism
-        avg_pkt_size = np.random.choice([64, 128, 512, 1024, 1500], p=[0.3, 0.2, 0.2, 0.2, 0.1])
-        
-        # BPS: Derived from PPS * Avg Size * 8 (bits) roughly, plus some variation
-        bps = pps * avg_pkt_size * 8 * np.random.uniform(0.9, 1.1)
+    data = {
+        "timestamp": timestamps,
+        "dpid": dpid,
+        "src_mac": _MACS[src_idx],
+        "dst_mac": _MACS[dst_idx],
+        "packet_count": packet_count,
+        "byte_count": byte_count,
+        "duration_sec": duration,
+        "pps": pps,
+        "bps": bps,
+        "avg_pkt_size": avg_pkt_size
+    }
 
-        # Duration: Short flows
-        duration = np.random.uniform(1, 60)
-        
-        # Counts
-        packet_count = int(pps * duration)
-        byte_count = int(bps * duration / 8)
-
-        data.append({
-            "timestamp": ts,
-            "dpid": dpid,
-            "src_mac": src,
-            "dst_mac": dst,
-            "packet_count": packet_count,
-            "byte_count": byte_count,
-            "duration_sec": duration,
-            "pps": pps,
-            "bps": bps,
-            "avg_pkt_size": avg_pkt_size
-        })
-
-    df = pd.DataFrame(data)
-    
     # Ensure directory exists
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
     
-    # Save to CSV
-    df.to_csv(output_file, index=False)
-    print(f"[INFO] Successfully saved {len(df)} rows to {output_file}")
+    # Writers take the arrays straight from an Arrow table when pyarrow is available
+    table = pa.table(data) if PYARROW_AVAILABLE else None
+    
+    if output_format in ('csv', 'both'):
+        # Appending only writes the new rows - the header goes into a new file only
+        write_header = not (append and os.path.exists(output_file) and os.path.getsize(output_file) > 0)
+        
+        with open(output_file, 'ab' if append else 'wb') as f:
+            if PYARROW_AVAILABLE:
+                pcsv.write_csv(table, f,
+                               write_options=pcsv.WriteOptions(include_header=write_header))
+            else:
+                import pandas as pd
+                pd.DataFrame(data).to_csv(f, index=False, header=write_header)
+            if append:
+                f.flush()
+                os.fsync(f.fileno())
+        print(f"[INFO] Successfully {'appended' if append else 'saved'} {n} rows to {output_file}")
+    
+    if output_format in ('parquet', 'both'):
+        parquet_file = os.path.splitext(output_file)[0] + '.parquet'
+        # Dictionary encoding stores the 8 distinct MACs once per column chunk
+        pq.write_table(table, parquet_file, compression='zstd',
+                       use_dictionary=['src_mac', 'dst_mac'])
+        print(f"[INFO] Successfully saved {n} rows to {parquet_file}")
     
-    # Preview
-    print("\n[INFO] Data Preview:")
-    print(df[['pps', 'bps', 'avg_pkt_size']].describe())
+    # Preview (computed on the arrays - no extra DataFrame pass)
+    # Nothing to summarise for an empty run - percentile needs at least one value
+    if preview and n > 0:
+        print("\n[INFO] Data Preview:")
+        print(f"{'':>14}{'mean':>12}{'min':>12}{'25%':>12}{'50%':>12}{'75%':>12}{'max':>12}")
+        for col in ('pps', 'bps', 'avg_pkt_size'):
+            values = data[col]
+            q25, q50, q75 = np.percentile(values, [25, 50, 75])
+            print(f"{col:>14}{values.mean():>12.2f}{values.min():>12.2f}"
+                  f"{q25:>12.2f}{q50:>12.2f}{q75:>12.2f}{values.max():>12.2f}")
 
 if __name__ == "__main__":
     # Ensure we write to the correct relative path
@@ -85,4 +214,4 @@ if __name__ == "__main__":
     base_dir = os.path.dirname(os.path.abspath(__file__))
     target_path = os.path.join(base_dir, 'controller', 'traffic_data.csv')
     
-    generate_normal_traffic(output_file=target_path)
+    generate_normal_traffic(output_file=target_path, preview=True)
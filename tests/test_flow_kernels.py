@@ -0,0 +1,74 @@
+"""
+Flow kernel checks: the NumPy and loop (Numba) versions of compute_rates
+must agree, including when a stats reply repeats a history slot.
+
+Run from the project root:
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'controller'))
+
+import flow_kernels  # noqa: E402
+
+
+def _run(kernel, idxs, cur_pkts, cur_bytes, timestamp, history):
+    """Run a kernel on copies of the history; return (pps, bps, history)."""
+    prev_pkts, prev_bytes, prev_ts = (arr.copy() for arr in history)
+    pps = np.empty(len(idxs))
+    bps = np.empty(len(idxs))
+    kernel(np.asarray(idxs, dtype=np.intp),
+           np.asarray(cur_pkts, dtype=np.float64),
+           np.asarray(cur_bytes, dtype=np.float64),
+           timestamp, prev_pkts, prev_bytes, prev_ts, pps, bps)
+    return pps, bps, (prev_pkts, prev_bytes, prev_ts)
+
+
+class ComputeRatesTest(unittest.TestCase):
+
+    def setUp(self):
+        # Slot 0: sampled at t=1, slot 1: never sampled, slot 2: sampled at t=1
+        self.history = (
+            np.array([100.0, 0.0, 50.0]),
+            np.array([10000.0, 0.0, 5000.0]),
+            np.array([1.0, np.nan, 1.0]),
+        )
+        self.kernels = [flow_kernels._compute_rates_numpy, flow_kernels._compute_rates_loop]
+        if flow_kernels.NUMBA_AVAILABLE:
+            self.kernels.append(flow_kernels.compute_rates)
+
+    def _assert_all_agree(self, *args):
+        results = [_run(kernel, *args, self.history) for kernel in self.kernels]
+        expected = results[0]
+        for result in results[1:]:
+            np.testing.assert_allclose(result[0], expected[0])
+            np.testing.assert_allclose(result[1], expected[1])
+            for got, want in zip(result[2], expected[2]):
+                np.testing.assert_allclose(got, want)
+        return expected
+
+    def test_rates_from_deltas(self):
+        pps, bps, (prev_pkts, _, prev_ts) = self._assert_all_agree(
+            [0, 1, 2], [300.0, 7.0, 40.0], [30000.0, 700.0, 4000.0], 3.0)
+        np.testing.assert_allclose(pps, [100.0, 0.0, 0.0])   # New flow and counter reset give 0
+        np.testing.assert_allclose(bps, [80000.0, 0.0, 0.0])
+        np.testing.assert_allclose(prev_pkts, [300.0, 7.0, 40.0])
+        np.testing.assert_allclose(prev_ts, [3.0, 3.0, 3.0])
+
+    def test_duplicate_slots(self):
+        pps, _, (prev_pkts, prev_bytes, _) = self._assert_all_agree(
+            [0, 0, 2], [300.0, 500.0, 70.0], [30000.0, 50000.0, 7000.0], 3.0)
+        # Each row is measured against the counters from before the call...
+        np.testing.assert_allclose(pps, [100.0, 200.0, 10.0])
+        # ...and the last row for a slot is what is kept
+        self.assertEqual(prev_pkts[0], 500.0)
+        self.assertEqual(prev_bytes[0], 50000.0)
+
+
+if __name__ == '__main__':
+    unittest.main()